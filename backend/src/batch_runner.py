@@ -0,0 +1,253 @@
+"""
+Headless batch race runner for Race Oracle
+Runs complete races with the physics Simulation as fast as possible, spread
+across a process pool, and returns a compact summary per race.
+
+Usage:
+    python batch_runner.py --races 200 --laps 3 --chaos 0.3 --weather Wet
+    python batch_runner.py --races 1000 --backend batched --output results.jsonl
+"""
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from simulation import Simulation
+
+DEFAULT_TRACK_PATH = Path(__file__).resolve().parent.parent.parent / "public" / "tracks" / "monza_track_real.json"
+DEFAULT_LAPS = 3
+TIRE_COMPOUNDS = ["Soft", "Medium", "Hard"]
+
+# Without an explicit max_time a race is called after this many times its expected
+# duration (laps at REFERENCE_SPEED, or DEFAULT_LAP_TIME per lap without a track)
+RACE_TIME_FACTOR = 3.0
+REFERENCE_SPEED = 50.0  # average track units (m) per second over a lap
+DEFAULT_LAP_TIME = 90.0  # seconds
+
+# Race config installed once per worker process by the pool initializer
+_WORKER_CONFIG: Optional[Dict] = None
+
+
+def load_track(path=DEFAULT_TRACK_PATH) -> List[Dict]:
+    """Track points from a track JSON file"""
+    with open(path, 'r') as f:
+        return json.load(f)["points"]
+
+
+def default_agents(num_drivers: int = 20) -> List[Dict]:
+    """Agent configs for the first num_drivers of the 2025 grid"""
+    from race_data import DRIVER_PROFILES
+    agents = []
+    for i, profile in enumerate(list(DRIVER_PROFILES.values())[:num_drivers]):
+        agents.append({
+            "driver_profile": {
+                "name": profile["name"],
+                "aggression": profile["aggression"],
+                "tire_management": profile["tire_management"],
+                "consistency": profile["consistency"],
+            },
+            "tire_compound": TIRE_COMPOUNDS[i % len(TIRE_COMPOUNDS)],
+        })
+    return agents
+
+
+def _lap_counts(sim: Simulation) -> List[int]:
+    if sim.field is not None:
+        return sim.field.current_lap.tolist()
+    return [v.current_lap for v in sim.vehicles]
+
+
+def _statuses(sim: Simulation) -> List[str]:
+    if sim.field is not None:
+        return sim.field.status
+    return [v.status for v in sim.vehicles]
+
+
+def _set_status(sim: Simulation, i: int, status: str):
+    if sim.field is not None:
+        sim.field.status[i] = status
+    else:
+        sim.vehicles[i].status = status
+
+
+def default_max_time(sim: Simulation, laps: int) -> float:
+    """Simulated seconds after which a race is called (cars that stall never finish)"""
+    if sim.track is not None and sim.track.total_length > 0:
+        lap_time = sim.track.total_length / REFERENCE_SPEED
+    else:
+        lap_time = DEFAULT_LAP_TIME
+    return RACE_TIME_FACTOR * laps * lap_time
+
+
+def run_race(config: Dict, seed: int) -> Dict:
+    """
+    Run one race to completion and summarise it.
+    config holds Simulation.configure params plus "laps", optional "dt" and
+    "max_time" (simulated seconds before unfinished cars are classified;
+    default_max_time() when not given).
+    """
+    random.seed(seed)
+    started = time.perf_counter()
+
+    sim = Simulation()
+    sim.configure(config)
+    if "dt" in config:
+        sim.dt = config["dt"]
+    laps = config.get("laps", DEFAULT_LAPS)
+    max_time = config.get("max_time") or default_max_time(sim, laps)
+
+    count = len(sim.vehicles)
+    lap_starts = [0.0] * count
+    lap_times: List[List[float]] = [[] for _ in range(count)]
+    finish_times: List[Optional[float]] = [None] * count
+    previous_laps = _lap_counts(sim)
+    running = count
+
+    while running and sim.simulation_time < max_time:
+        sim.update()
+        now = sim.simulation_time
+        statuses = _statuses(sim)
+        current_laps = _lap_counts(sim)
+        running = 0
+        for i in range(count):
+            if statuses[i] != "Racing":
+                continue
+            if current_laps[i] != previous_laps[i]:
+                previous_laps[i] = current_laps[i]
+                lap_times[i].append(round(now - lap_starts[i], 3))
+                lap_starts[i] = now
+                if len(lap_times[i]) >= laps:
+                    # Take the car off track once it completes the race distance
+                    _set_status(sim, i, "Finished")
+                    finish_times[i] = round(now, 3)
+                    continue
+            running += 1
+
+    sim.sync_vehicles()
+    results = []
+    for i, vehicle in enumerate(sim.vehicles):
+        results.append({
+            "name": vehicle.driver.name,
+            "status": vehicle.status,
+            "finish_time": finish_times[i],
+            "laps_completed": len(lap_times[i]),
+            "lap_times": lap_times[i],
+            "tire_wear": round(vehicle.tire.current_wear * 100, 1),
+            "_distance": vehicle.distance_on_track,
+        })
+
+    # Finishers by time, then unfinished cars by progress; DNFs last
+    def order(result):
+        if result["finish_time"] is not None:
+            return (0, result["finish_time"], 0.0)
+        dnf = result["status"].startswith("DNF")
+        return (2 if dnf else 1, -result["laps_completed"], -result["_distance"])
+
+    results.sort(key=order)
+    for position, result in enumerate(results, start=1):
+        result["position"] = position
+        del result["_distance"]
+
+    return {
+        "seed": seed,
+        "laps": laps,
+        "sim_time": round(sim.simulation_time, 3),
+        "wall_time": round(time.perf_counter() - started, 4),
+        "finishing_order": [r["name"] for r in results],
+        "dnfs": [r["name"] for r in results if r["status"].startswith("DNF")],
+        "results": results,
+    }
+
+
+def _init_worker(config: Dict):
+    global _WORKER_CONFIG
+    _WORKER_CONFIG = config
+
+
+def _run_seeded(seed: int) -> Dict:
+    return run_race(_WORKER_CONFIG, seed)
+
+
+def race_seeds(num_races: int, seed: Optional[int] = None) -> List[int]:
+    """Per-race seeds derived from one base seed (random if None)"""
+    rng = random.Random(seed)
+    return [rng.getrandbits(32) for _ in range(num_races)]
+
+
+def run_races(config: Dict, num_races: int, seed: Optional[int] = None, workers: Optional[int] = None) -> List[Dict]:
+    """
+    Run num_races independent races over a process pool (all cores by default).
+    Results are in race order and reproducible for a given seed.
+    """
+    seeds = race_seeds(num_races, seed)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or num_races <= 1:
+        return [run_race(config, race_seed) for race_seed in seeds]
+
+    # The config (track included) is shipped once per worker, not once per race
+    chunksize = max(1, num_races // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,)) as pool:
+        return list(pool.map(_run_seeded, seeds, chunksize=chunksize))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless races as fast as possible")
+    parser.add_argument("--races", type=int, default=100)
+    parser.add_argument("--laps", type=int, default=DEFAULT_LAPS)
+    parser.add_argument("--drivers", type=int, default=20, help="Drivers from the default grid")
+    parser.add_argument("--agents", help="JSON file with a list of agent configs (overrides --drivers)")
+    parser.add_argument("--track", default=str(DEFAULT_TRACK_PATH), help="Track JSON file")
+    parser.add_argument("--weather", default="Dry", choices=["Dry", "Wet"])
+    parser.add_argument("--chaos", type=float, default=0.0)
+    parser.add_argument("--backend", default="object", choices=["object", "batched"])
+    parser.add_argument("--dt", type=float, default=0.05, help="Physics timestep in seconds")
+    parser.add_argument("--max-time", type=float, default=None, help="Simulated seconds before a race is called (default: 3x the expected race time)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="Write one JSON summary per line to this file")
+    args = parser.parse_args()
+
+    if args.agents:
+        with open(args.agents, 'r') as f:
+            agents = json.load(f)
+    else:
+        agents = default_agents(args.drivers)
+
+    config = {
+        "track_data": load_track(args.track),
+        "agents": agents,
+        "weather": args.weather,
+        "chaos_level": args.chaos,
+        "backend": args.backend,
+        "laps": args.laps,
+        "dt": args.dt,
+    }
+    if args.max_time is not None:
+        config["max_time"] = args.max_time
+
+    started = time.perf_counter()
+    summaries = run_races(config, args.races, seed=args.seed, workers=args.workers)
+    elapsed = time.perf_counter() - started
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            for summary in summaries:
+                f.write(json.dumps(summary, separators=(",", ":")) + "\n")
+        print(f"✓ Wrote {len(summaries)} race summaries to {args.output}")
+
+    wins: Dict[str, int] = {}
+    for summary in summaries:
+        if summary["finishing_order"]:
+            winner = summary["finishing_order"][0]
+            wins[winner] = wins.get(winner, 0) + 1
+    print(f"✓ {len(summaries)} races in {elapsed:.1f}s ({len(summaries) / elapsed * 60:.0f} races/min)")
+    for name, count in sorted(wins.items(), key=lambda item: -item[1])[:5]:
+        print(f"  {name}: {count} wins ({count / len(summaries):.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Benchmark suite for Race Oracle
+Times (timeit autorange, median of repeats) and measures peak traced memory
+(tracemalloc, one separate run) for telemetry generation, snapshotting,
+physics, WebSocket fan-out and track extraction. Results are JSON files;
+`compare` flags benchmarks that got slower or hungrier than a baseline.
+
+Usage:
+    python benchmarks.py run --output ../benchmarks/baseline.json
+    python benchmarks.py run -k snapshot
+    python benchmarks.py compare ../benchmarks/baseline.json ../benchmarks/latest.json
+    python benchmarks.py list
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent.parent / "benchmarks"
+DEFAULT_REPEAT = 5
+
+# Relative slowdown (and memory growth) reported as a regression
+DEFAULT_THRESHOLD = 0.15
+# Memory changes smaller than this are noise, whatever the ratio
+MIN_MEMORY_DELTA_KIB = 64.0
+
+# name -> setup(); setup returns the zero-argument callable that is measured
+Setup = Callable[[], Callable[[], object]]
+
+
+def _quiet(function: Callable[[], object]) -> Callable[[], object]:
+    """Wrap a callable so its prints do not end up in the benchmark output"""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return function()
+    return run
+
+
+def _synthetic_generation(num_laps: int, num_drivers: int) -> Setup:
+    def setup():
+        import race_data
+        scenario = dict(
+            race_data.RACE_SCENARIOS.metadata[0],
+            num_laps=num_laps,
+            num_drivers=num_drivers,
+            drivers=list(race_data.DRIVER_PROFILES)[:num_drivers],
+        )
+        return lambda: race_data.generate_race_telemetry(scenario)
+    return setup
+
+
+def _real_track_generation(num_laps: int, num_drivers: int) -> Setup:
+    def setup():
+        from race_data_real import generate_race_with_real_track
+        from track_catalog import TRACK_CATALOG
+        track_data = TRACK_CATALOG.get("monza_real").load()
+        return lambda: generate_race_with_real_track(track_data, num_laps, num_drivers, seed=0)
+    return setup
+
+
+def _snapshot(module_name: str, fraction: float) -> Setup:
+    def setup():
+        module = __import__(module_name)
+        scenario = module.RACE_SCENARIOS.get(0)
+        max_time = max(scenario["race_data"][d].time[-1] for d in scenario["drivers"])
+        at = max_time * fraction
+        return lambda: module.get_race_snapshot(scenario, at, interpolate=True)
+    return setup
+
+
+def _simulation_update(num_cars: int, backend: str) -> Setup:
+    def setup():
+        from batch_runner import default_agents
+        from simulation import Simulation
+        from track_catalog import TRACK_CATALOG
+        agents = default_agents()
+        random.seed(0)
+        sim = Simulation()
+        sim.configure({
+            "track_data": TRACK_CATALOG.get("monza_real").points,
+            "agents": [agents[i % len(agents)] for i in range(num_cars)],
+            "backend": backend,
+        })
+        return sim.update
+    return setup
+
+
+class _FakeWebSocket:
+    """In-process stand-in for a connected client; sends complete immediately"""
+
+    def __init__(self):
+        self.bytes_sent = 0
+
+    async def send_text(self, data: str):
+        self.bytes_sent += len(data)
+
+    async def send_bytes(self, data: bytes):
+        self.bytes_sent += len(data)
+
+
+def _broadcast(num_connections: int) -> Setup:
+    def setup():
+        with contextlib.redirect_stdout(io.StringIO()):
+            from main import ConnectionManager
+            import race_data
+        manager = ConnectionManager()
+        manager.active_connections = [_FakeWebSocket() for _ in range(num_connections)]
+        message = dict(race_data.get_race_snapshot(race_data.RACE_SCENARIOS.get(0), 120.0, interpolate=True),
+                       scenario_id=0, is_playing=True, max_time=600.0, playback_speed=1.0)
+        loop = asyncio.new_event_loop()
+        return lambda: loop.run_until_complete(manager.broadcast(message))
+    return setup
+
+
+class _SyntheticLap:
+    def __init__(self, telemetry):
+        self._telemetry = telemetry
+
+    def get_telemetry(self):
+        return self._telemetry
+
+
+class _SyntheticLaps:
+    """Minimal stand-in for FastF1 session laps: one driver with one lap"""
+
+    def __init__(self, telemetry):
+        import pandas as pd
+        self._drivers = pd.Series(["SYN"])
+        self.iloc = [_SyntheticLap(telemetry)]
+
+    def __getitem__(self, key):
+        # laps['Driver'] returns the driver column; laps[mask] returns the laps
+        return self._drivers if isinstance(key, str) else self
+
+    def __len__(self) -> int:
+        return 1
+
+
+class _SyntheticSession:
+    def __init__(self, telemetry):
+        self.laps = _SyntheticLaps(telemetry)
+
+
+def _synthetic_telemetry(num_points: int):
+    """Lap telemetry DataFrame of an oval with varying speed"""
+    import pandas as pd
+    angle = np.linspace(0.0, 2.0 * np.pi, num_points, endpoint=False)
+    speed = 220.0 + 100.0 * np.cos(4.0 * angle)
+    return pd.DataFrame({
+        "X": 8000.0 * np.cos(angle),
+        "Y": 5000.0 * np.sin(angle),
+        "Z": np.zeros(num_points),
+        "Speed": speed,
+        "Throttle": np.clip(speed / 3.2, 0.0, 100.0),
+        "Brake": speed < 160.0,
+    })
+
+
+def _fetch_track(num_points: int) -> Setup:
+    def setup():
+        from fetch_real_data import fetch_track_data
+        session = _SyntheticSession(_synthetic_telemetry(num_points))
+        # Removed once the measured callable (which holds it) is released, or at exit
+        output_dir = tempfile.TemporaryDirectory(prefix="race-oracle-bench-")
+        return _quiet(lambda: fetch_track_data(2024, "Synthetic", session=session, output_dir=output_dir.name))
+    return setup
+
+
+def benchmark_cases() -> Dict[str, Setup]:
+    cases: Dict[str, Setup] = {}
+    for num_laps, num_drivers in ((5, 5), (5, 20), (20, 20)):
+        cases[f"generate_race_telemetry[laps={num_laps},drivers={num_drivers}]"] = _synthetic_generation(num_laps, num_drivers)
+    for num_laps, num_drivers in ((3, 3), (8, 5)):
+        cases[f"generate_race_with_real_track[laps={num_laps},drivers={num_drivers}]"] = _real_track_generation(num_laps, num_drivers)
+    for module_name in ("race_data", "race_data_real"):
+        for label, fraction in (("early", 0.05), ("mid", 0.5), ("late", 0.95)):
+            cases[f"get_race_snapshot[{module_name},{label}]"] = _snapshot(module_name, fraction)
+    for backend in ("object", "batched"):
+        for num_cars in (1, 10, 50):
+            cases[f"simulation_update[{backend},cars={num_cars}]"] = _simulation_update(num_cars, backend)
+    for num_connections in (10, 100, 1000):
+        cases[f"broadcast[connections={num_connections}]"] = _broadcast(num_connections)
+    for num_points in (1000, 20000):
+        cases[f"fetch_track_data[points={num_points}]"] = _fetch_track(num_points)
+    return cases
+
+
+def measure(run: Callable[[], object], repeat: int = DEFAULT_REPEAT) -> Dict:
+    """Per-call seconds (median/min over repeat rounds) and peak traced KiB of one call"""
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "number": number,
+        "repeat": repeat,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(pattern: Optional[str] = None, repeat: int = DEFAULT_REPEAT) -> Dict:
+    """Run every benchmark whose name contains pattern; returns the results document"""
+    results = {}
+    for name, setup in benchmark_cases().items():
+        if pattern and pattern not in name:
+            continue
+        result = measure(setup(), repeat)
+        results[name] = result
+        print(f"  {name:55s} {result['median_s'] * 1000:10.3f} ms  {result['peak_kib']:10.1f} KiB")
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Print a comparison table; returns the names of regressed benchmarks"""
+    regressions = []
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"  {name:55s} (new)")
+            continue
+        # Fastest round: least affected by other load on the machine
+        ratio = now["min_s"] / before["min_s"]
+        memory_delta = now["peak_kib"] - before["peak_kib"]
+        slower = ratio > 1.0 + threshold
+        hungrier = memory_delta > MIN_MEMORY_DELTA_KIB and now["peak_kib"] > before["peak_kib"] * (1.0 + threshold)
+        mark = "⚠" if slower or hungrier else "✓"
+        print(f"{mark} {name:55s} {before['min_s'] * 1000:9.3f} -> {now['min_s'] * 1000:9.3f} ms "
+              f"({(ratio - 1.0) * 100:+6.1f}%)  {before['peak_kib']:9.1f} -> {now['peak_kib']:9.1f} KiB")
+        if slower or hungrier:
+            regressions.append(name)
+    return regressions
+
+
+def _load(path) -> Dict:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run and compare Race Oracle benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="Run the suite and write a results file")
+    run.add_argument("-k", dest="pattern", help="Only benchmarks whose name contains this")
+    run.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    run.add_argument("--output", default=str(BENCH_DIR / "latest.json"))
+    diff = commands.add_parser("compare", help="Compare results against a baseline (exit 1 on regression)")
+    diff.add_argument("baseline")
+    diff.add_argument("current", nargs="?", help="Results file (default: run the suite now)")
+    diff.add_argument("-k", dest="pattern", help="Only benchmarks whose name contains this (when running)")
+    diff.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed relative slowdown")
+    commands.add_parser("list", help="List benchmark names")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for name in benchmark_cases():
+            print(name)
+        return
+
+    if args.command == "run":
+        results = run_benchmarks(args.pattern, args.repeat)
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2))
+        print(f"✓ Wrote {len(results['results'])} results to {output}")
+        return
+
+    baseline = _load(args.baseline)
+    current = _load(args.current) if args.current else run_benchmarks(args.pattern)
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"⚠ {len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1)
+    print("✓ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Binary columnar export format for Race Oracle scenario telemetry
+Typed little-endian columns behind a small JSON header, optionally
+zlib-compressed per column. Uncompressed files decode zero-copy into NumPy
+arrays (np.frombuffer over the bytes or a memory map).
+
+Layout:
+    magic    b"ROCF"
+    <BBHI    format version, flags (bit 0: zlib), reserved, header length
+    header   UTF-8 JSON: metadata, status codes, track_xy and per-driver
+             column specs {name, dtype, offset, nbytes[, stored_nbytes]}
+    columns  raw (or compressed) column bytes, each starting on an 8-byte
+             boundary; offsets are relative to the start of the data section
+
+Usage:
+    python columnar_format.py export 3 scenario_3.roc [--compress]
+    python columnar_format.py export all exports/ [--compress]
+    python columnar_format.py info scenario_3.roc
+"""
+import argparse
+import json
+import mmap
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from scenario_store import STATUS_CODES, ColumnarRaceData, DriverTelemetry
+
+MEDIA_TYPE = "application/vnd.race-oracle.columnar"
+MAGIC = b"ROCF"
+FORMAT_VERSION = 1
+FLAG_ZLIB = 1
+
+_PREAMBLE = struct.Struct("<4sBBHI")
+_ALIGN = 8
+
+
+def _pad(length: int) -> int:
+    return -length % _ALIGN
+
+
+def encode_race_data(race_data: ColumnarRaceData, metadata: Optional[Dict] = None, compress: bool = False,
+                     fields: Optional[Iterable[str]] = None) -> bytes:
+    """Serialize columnar race data (optionally only some columns) to the binary format"""
+    wanted = None if fields is None else set(fields)
+    blobs = []
+    offset = 0
+
+    def add(array: np.ndarray) -> Dict:
+        nonlocal offset
+        array = np.ascontiguousarray(array)
+        dtype = array.dtype.newbyteorder("<") if array.dtype.byteorder == ">" else array.dtype
+        raw = array.astype(dtype, copy=False).tobytes()
+        spec = {"dtype": dtype.str, "shape": list(array.shape), "offset": offset, "nbytes": len(raw)}
+        stored = zlib.compress(raw, 6) if compress else raw
+        if compress:
+            spec["stored_nbytes"] = len(stored)
+        blobs.append(stored + b"\0" * _pad(len(stored)))
+        offset += len(stored) + _pad(len(stored))
+        return spec
+
+    header = {"metadata": metadata or {}, "status_codes": STATUS_CODES, "track_xy": None, "drivers": []}
+    track_xy = None
+    for driver_id, telemetry in race_data.items():
+        columns = []
+        for name, column in telemetry.columns.items():
+            # time and track_point are always kept: time indexes samples, track_point locates x/y
+            if wanted is not None and name not in wanted and name not in ("time", "track_point"):
+                continue
+            columns.append(dict(add(column), name=name))
+        constants = telemetry.constants if wanted is None else {
+            k: v for k, v in telemetry.constants.items() if k in wanted
+        }
+        header["drivers"].append({"id": driver_id, "length": len(telemetry), "constants": constants, "columns": columns})
+        if track_xy is None and telemetry.track_xy is not None:
+            track_xy = telemetry.track_xy
+    if track_xy is not None:
+        header["track_xy"] = add(np.asarray(track_xy, dtype=np.float64))
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    header_bytes += b" " * _pad(_PREAMBLE.size + len(header_bytes))
+    preamble = _PREAMBLE.pack(MAGIC, FORMAT_VERSION, FLAG_ZLIB if compress else 0, 0, len(header_bytes))
+    return b"".join([preamble, header_bytes, *blobs])
+
+
+def read_header(buffer) -> Tuple[Dict, int, int]:
+    """(header, flags, data offset) of an encoded buffer"""
+    magic, version, flags, _, header_length = _PREAMBLE.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a Race Oracle columnar file")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported columnar format version {version}")
+    start = _PREAMBLE.size
+    header = json.loads(bytes(buffer[start:start + header_length]))
+    return header, flags, start + header_length
+
+
+def _column(buffer, spec: Dict, data_offset: int, compressed: bool) -> np.ndarray:
+    dtype = np.dtype(spec["dtype"])
+    start = data_offset + spec["offset"]
+    if compressed:
+        raw = zlib.decompress(buffer[start:start + spec["stored_nbytes"]])
+        array = np.frombuffer(raw, dtype=dtype)
+    else:
+        array = np.frombuffer(buffer, dtype=dtype, count=spec["nbytes"] // dtype.itemsize, offset=start)
+    return array.reshape(spec["shape"])
+
+
+def decode_race_data(buffer) -> Tuple[Dict, ColumnarRaceData]:
+    """
+    (metadata, race data) from an encoded buffer. Columns of uncompressed
+    buffers are read-only views into the buffer, not copies.
+    """
+    header, flags, data_offset = read_header(buffer)
+    compressed = bool(flags & FLAG_ZLIB)
+    if header["status_codes"] != STATUS_CODES:
+        raise ValueError("Status codes differ from this server's")
+
+    track_xy = None
+    if header["track_xy"] is not None:
+        track_xy = _column(buffer, header["track_xy"], data_offset, compressed)
+
+    drivers = {}
+    for driver in header["drivers"]:
+        columns = {spec["name"]: _column(buffer, spec, data_offset, compressed) for spec in driver["columns"]}
+        drivers[driver["id"]] = DriverTelemetry(columns, constants=driver["constants"], track_xy=track_xy)
+    return header["metadata"], ColumnarRaceData(drivers)
+
+
+def write_file(path, race_data: ColumnarRaceData, metadata: Optional[Dict] = None, compress: bool = False):
+    Path(path).write_bytes(encode_race_data(race_data, metadata, compress))
+
+
+def read_file(path) -> Tuple[Dict, ColumnarRaceData]:
+    """Decode a file through a read-only memory map (pages load on first access)"""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return decode_race_data(mapped)
+
+
+def scenario_metadata(scenario: Dict) -> Dict:
+    """Scenario fields stored in the file header (everything except telemetry)"""
+    return {k: v for k, v in scenario.items() if k != "race_data"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export scenarios in the binary columnar format")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Write one scenario (or 'all') to disk")
+    export.add_argument("scenario", help="Scenario id or 'all'")
+    export.add_argument("output", help="Output file (or directory for 'all')")
+    export.add_argument("--compress", action="store_true", help="zlib-compress each column")
+    info = commands.add_parser("info", help="Describe an exported file")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        with open(args.path, 'rb') as f:
+            header, flags, _ = read_header(f.read())
+        print(f"✓ {args.path}: {len(header['drivers'])} drivers, {'zlib' if flags & FLAG_ZLIB else 'uncompressed'}")
+        for driver in header["drivers"]:
+            columns = ", ".join(f"{c['name']}:{c['dtype']}" for c in driver["columns"])
+            print(f"  {driver['id']}: {driver['length']} samples ({columns})")
+        return
+
+    try:
+        from race_data_real import RACE_SCENARIOS
+    except Exception:
+        from race_data import RACE_SCENARIOS
+
+    if args.scenario == "all":
+        output_dir = Path(args.output)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        scenario_ids = range(len(RACE_SCENARIOS))
+        paths = [output_dir / f"scenario_{i}.roc" for i in scenario_ids]
+    else:
+        scenario_ids = [int(args.scenario)]
+        paths = [Path(args.output)]
+
+    for scenario_id, path in zip(scenario_ids, paths):
+        scenario = RACE_SCENARIOS.get(scenario_id)
+        write_file(path, scenario["race_data"], scenario_metadata(scenario), args.compress)
+        print(f"✓ Wrote scenario {scenario_id} to {path} ({path.stat().st_size / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Error-bounded telemetry decimation for Race Oracle
+Drops samples that linear interpolation between their neighbours already
+reproduces within a tolerance, and serves level-of-detail (LOD) views of a
+scenario: a coarse whole race, or a time window at full resolution.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from scenario_store import ColumnarRaceData, DriverTelemetry
+
+# Maximum interpolation error per column at LOD 1 (speed in km/h, distance in track units)
+DEFAULT_TOLERANCES = {"speed": 5.0, "distance": 50.0}
+
+# LOD 0 is full resolution; each level above 1 allows twice the error of the previous
+# one, so LOD 4 is still within 40 km/h and 400 m
+MAX_LOD = 4
+LOD_FACTOR = 2.0
+
+# Samples where these columns change are always kept (lap boundaries, retirements)
+BREAK_COLUMNS = ("lap", "status")
+
+
+def lod_tolerances(lod: int, tolerances: Dict[str, float] = DEFAULT_TOLERANCES) -> Optional[Dict[str, float]]:
+    """Tolerances for a level of detail, or None for full resolution"""
+    if not 0 <= lod <= MAX_LOD:
+        raise ValueError(f"lod must be between 0 and {MAX_LOD}")
+    if lod == 0:
+        return None
+    scale = LOD_FACTOR ** (lod - 1)
+    return {name: tolerance * scale for name, tolerance in tolerances.items()}
+
+
+def decimate_indices(time: np.ndarray, channels: List[Tuple[np.ndarray, float]], keep: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Indices of the samples to keep so that interpolating every channel
+    linearly in time between kept samples stays within its tolerance
+    (Ramer-Douglas-Peucker with a per-channel error bound).
+    `keep` is an optional boolean mask of samples that must survive.
+    """
+    n = len(time)
+    if n <= 2:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool) if keep is None else keep.copy()
+    keep[0] = keep[-1] = True
+    t = np.asarray(time, dtype=np.float64)
+    channels = [(np.asarray(values, dtype=np.float64), tolerance) for values, tolerance in channels]
+
+    anchors = np.flatnonzero(keep)
+    stack = list(zip(anchors[:-1].tolist(), anchors[1:].tolist()))
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        span = t[b] - t[a]
+        fraction = (t[a + 1:b] - t[a]) / span if span > 0 else np.zeros(b - a - 1)
+        error = np.zeros(b - a - 1)
+        for values, tolerance in channels:
+            predicted = values[a] + (values[b] - values[a]) * fraction
+            np.maximum(error, np.abs(values[a + 1:b] - predicted) / tolerance, out=error)
+        worst = int(np.argmax(error))
+        if error[worst] > 1.0:
+            m = a + 1 + worst
+            keep[m] = True
+            stack.append((a, m))
+            stack.append((m, b))
+    return np.flatnonzero(keep)
+
+
+def _breakpoints(telemetry: DriverTelemetry) -> np.ndarray:
+    """Mask of samples on either side of a change in a BREAK_COLUMNS column"""
+    keep = np.zeros(len(telemetry), dtype=bool)
+    for name in BREAK_COLUMNS:
+        column = telemetry.columns.get(name)
+        if column is None or len(column) < 2:
+            continue
+        changed = np.flatnonzero(column[1:] != column[:-1])
+        keep[changed] = True
+        keep[changed + 1] = True
+    return keep
+
+
+def decimate(telemetry: DriverTelemetry, tolerances: Dict[str, float] = DEFAULT_TOLERANCES) -> DriverTelemetry:
+    """Telemetry reduced to the samples needed to stay within tolerances"""
+    channels = [
+        (telemetry.columns[name], tolerance)
+        for name, tolerance in tolerances.items()
+        if name in telemetry.columns
+    ]
+    if not channels:
+        return telemetry
+    indices = decimate_indices(telemetry.time, channels, _breakpoints(telemetry))
+    if len(indices) == len(telemetry):
+        return telemetry
+    return telemetry.take(indices)
+
+
+def level_of_detail(race_data: ColumnarRaceData, lod: int = 0, t0: Optional[float] = None,
+                    t1: Optional[float] = None, tolerances: Dict[str, float] = DEFAULT_TOLERANCES) -> ColumnarRaceData:
+    """Race data restricted to [t0, t1] (if given) and decimated for lod"""
+    scaled = lod_tolerances(lod, tolerances)
+    drivers = {}
+    for driver_id, telemetry in race_data.items():
+        if t0 is not None or t1 is not None:
+            telemetry = telemetry.take(telemetry.window(t0, t1))
+        if scaled is not None:
+            telemetry = decimate(telemetry, scaled)
+        drivers[driver_id] = telemetry
+    return ColumnarRaceData(drivers)
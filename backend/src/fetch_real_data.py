@@ -2,30 +2,40 @@
 Fetch real F1 data from FastF1 API
 Gets actual track coordinates and telemetry from real races
 """
-import fastf1
-import json
 import numpy as np
 from pathlib import Path
 
-# Enable cache for faster loading
+from telemetry_store import TELEMETRY_STORE
+from track_sectors import segment_sectors
+from track_store import points_from_columns, save_track
+
 import os
 cache_dir = os.path.join(os.path.dirname(__file__), 'cache')
-os.makedirs(cache_dir, exist_ok=True)
-fastf1.Cache.enable_cache(cache_dir)
 
-def fetch_track_data(year=2023, circuit='Monza', session_type='Race'):
-    """
-    Fetch real track coordinates from FastF1
-    Returns track points with actual GPS coordinates
-    """
-    print(f"Fetching {circuit} {year} {session_type} data...")
-    
-    # Load session
-    session = fastf1.get_session(year, circuit, session_type)
+TRACKS_DIR = Path(__file__).parent.parent.parent / 'public' / 'tracks'
+
+_fastf1 = None
+
+
+def get_fastf1():
+    """Import fastf1 on first use and enable its cache for faster loading"""
+    global _fastf1
+    if _fastf1 is None:
+        import fastf1
+        os.makedirs(cache_dir, exist_ok=True)
+        fastf1.Cache.enable_cache(cache_dir)
+        _fastf1 = fastf1
+    return _fastf1
+
+
+def load_session(year, circuit, session_type='Race'):
+    session = get_fastf1().get_session(year, circuit, session_type)
     session.load()
-    
-    # Get fastest lap for track coordinates
-    # Use first driver's first valid lap
+    return session
+
+
+def find_track_telemetry(session):
+    """Telemetry of the first valid lap among the first 5 drivers"""
     drivers = session.laps['Driver'].unique()
     telemetry = None
     
@@ -51,82 +61,126 @@ def fetch_track_data(year=2023, circuit='Monza', session_type='Race'):
     
     if telemetry is None or len(telemetry) == 0:
         raise ValueError("Could not find any valid telemetry data")
+    return telemetry
+
+
+def track_columns_from_telemetry(telemetry):
+    """
+    Column arrays (x, y, z, distance, speed, throttle, brake) from a lap's
+    telemetry DataFrame; distance is the cumulative X/Y path length
+    """
+    def column(name):
+        if name in telemetry.columns:
+            return telemetry[name].to_numpy(dtype=np.float64)
+        return np.zeros(len(telemetry))
+    
+    x = column("X")
+    y = column("Y")
+    distance = np.concatenate(([0.0], np.cumsum(np.hypot(np.diff(x), np.diff(y)))))
+    return {
+        "x": x,
+        "y": y,
+        "z": column("Z"),
+        "distance": distance,
+        "speed": column("Speed"),
+        "throttle": column("Throttle"),
+        "brake": column("Brake"),
+    }
+
+
+def fetch_track_data(year=2023, circuit='Monza', session_type='Race', session=None, output_dir=TRACKS_DIR):
+    """
+    Fetch real track coordinates from FastF1
+    Returns track points with actual GPS coordinates.
+    Pass a loaded `session` (or any object with the same laps/telemetry
+    interface) to skip the FastF1 download; output_dir=None skips saving.
+    """
+    print(f"Fetching {circuit} {year} {session_type} data...")
+    
+    if session is None:
+        session = load_session(year, circuit, session_type)
+    
+    # Get first valid lap for track coordinates
+    telemetry = find_track_telemetry(session)
     
     # Extract coordinates
-    track_points = []
-    total_distance = 0
-
-    telemetry.reset_index(drop=True, inplace=True)  # ensures index = 0..N
-
-    for idx, row in enumerate(telemetry.itertuples()):
-        if idx > 0:
-            prev = telemetry.iloc[idx - 1]
-            dx = row.X - prev["X"]
-            dy = row.Y - prev["Y"]
-            segment_distance = np.sqrt(dx**2 + dy**2)
-            total_distance += segment_distance
-
-        track_points.append({
-            "x": float(row.X),
-            "y": float(row.Y),
-            "z": float(getattr(row, "Z", 0)),
-            "distance": float(total_distance),
-            "speed": float(row.Speed),
-            "throttle": float(row.Throttle),
-            "brake": float(row.Brake),
-        })
-
+    columns = track_columns_from_telemetry(telemetry)
+    total_distance = float(columns["distance"][-1])
     
     track_data = {
         'track_name': circuit,
         'year': year,
-        'total_length': float(total_distance),
-        'points': track_points
+        'total_length': total_distance,
+        'points': points_from_columns(columns)
     }
     
-    # Save to file
-    output_dir = Path(__file__).parent.parent.parent / 'public' / 'tracks'
-    output_dir.mkdir(parents=True, exist_ok=True)
+    if output_dir is not None:
+        # Save JSON for the frontend plus the compact column file
+        output_file = Path(output_dir) / f'{circuit.lower()}_track_real.json'
+        save_track(track_data, output_file, columns)
+        print(f"✓ Saved {len(track_data['points'])} track points to {output_file}")
     
-    output_file = output_dir / f'{circuit.lower()}_track_real.json'
-    with open(output_file, 'w') as f:
-        json.dump(track_data, f, indent=2)
-    
-    print(f"✓ Saved {len(track_points)} track points to {output_file}")
     print(f"✓ Total track length: {total_distance:.2f} meters")
     
     return track_data
 
 
-def fetch_driver_telemetry(year=2024, circuit='Monza', driver_code='VER'):
+def lap_telemetry_columns(lap_telemetry):
+    """Column arrays (time, speed, throttle, brake, x, y) of one lap's telemetry DataFrame"""
+    return {
+        'time': lap_telemetry['Time'].dt.total_seconds().to_numpy(dtype=np.float64),
+        'speed': lap_telemetry['Speed'].to_numpy(dtype=np.float64),
+        'throttle': lap_telemetry['Throttle'].to_numpy(dtype=np.float64),
+        'brake': lap_telemetry['Brake'].to_numpy(dtype=np.float64),
+        'x': lap_telemetry['X'].to_numpy(dtype=np.float64),
+        'y': lap_telemetry['Y'].to_numpy(dtype=np.float64),
+    }
+
+
+def backfill_driver_telemetry(year=2024, circuit='Monza', driver_code='VER', session=None, store=None):
     """
-    Fetch real driver telemetry from FastF1
-    Returns actual speed, throttle, brake data
+    Append every lap of a driver's race telemetry to the on-disk store,
+    skipping laps already stored (telemetry is only requested for new laps).
+    Returns the lap numbers written.
     """
-    print(f"Fetching {driver_code} telemetry from {circuit} {year}...")
-    
-    session = fastf1.get_session(year, circuit, 'Race')
-    session.load()
+    if store is None:
+        store = TELEMETRY_STORE
+    if session is None:
+        session = load_session(year, circuit, 'Race')
     
     # Get driver laps
     driver_laps = session.laps.pick_driver(driver_code)
     
-    telemetry_data = []
-    
-    for lap_num, lap in driver_laps.iterrows():
-        if lap['LapTime'] is not None:
-            lap_telemetry = lap.get_telemetry()
-            
-            for i, row in lap_telemetry.iterrows():
-                telemetry_data.append({
-                    'lap': int(lap['LapNumber']),
-                    'time': float(row['Time'].total_seconds()),
-                    'speed': float(row['Speed']),
-                    'throttle': float(row['Throttle']),
-                    'brake': float(row['Brake']),
-                    'x': float(row['X']),
-                    'y': float(row['Y']),
-                })
+    written = []
+    for _, lap in driver_laps.iterrows():
+        if lap['LapTime'] is None:
+            continue
+        lap_number = int(lap['LapNumber'])
+        if store.has_lap(year, circuit, driver_code, lap_number):
+            continue
+        store.append_lap(year, circuit, driver_code, lap_number, lap_telemetry_columns(lap.get_telemetry()))
+        written.append(lap_number)
+    
+    print(f"✓ Stored {len(written)} new laps for {driver_code} ({circuit} {year})")
+    return written
+
+
+def fetch_driver_telemetry(year=2024, circuit='Monza', driver_code='VER', session=None, store=None):
+    """
+    Fetch real driver telemetry from FastF1
+    Returns actual speed, throttle, brake data.
+    Laps go through the on-disk store, so repeated calls only fetch new laps.
+    """
+    print(f"Fetching {driver_code} telemetry from {circuit} {year}...")
+    
+    if store is None:
+        store = TELEMETRY_STORE
+    backfill_driver_telemetry(year, circuit, driver_code, session, store)
+    columns = store.load(year, circuit, driver_code)
+    
+    names = ['lap', 'time', 'speed', 'throttle', 'brake', 'x', 'y']
+    values = [np.asarray(columns[name]).tolist() for name in names]
+    telemetry_data = [dict(zip(names, row)) for row in zip(*values)]
     
     print(f"✓ Fetched {len(telemetry_data)} telemetry points for {driver_code}")
     
@@ -136,42 +190,14 @@ def fetch_driver_telemetry(year=2024, circuit='Monza', driver_code='VER'):
 def analyze_track_sectors(track_data):
     """
     Analyze track to identify corners, straights, braking zones
-    This helps Monte Carlo simulation be more realistic
+    This helps Monte Carlo simulation be more realistic.
+    Returns a distance-indexed sector table covering the whole lap.
     """
     points = track_data['points']
+    distances = np.array([p['distance'] for p in points], dtype=np.float64)
+    speeds = np.array([p['speed'] for p in points], dtype=np.float64)
     
-    # Calculate speed profile
-    speeds = [p['speed'] for p in points]
-    avg_speed = np.mean(speeds)
-    
-    # Identify sectors
-    sectors = []
-    current_sector = {'type': 'unknown', 'start': 0, 'speeds': []}
-    
-    for i, point in enumerate(points):
-        speed = point['speed']
-        
-        # Classify based on speed
-        if speed > avg_speed * 1.2:
-            sector_type = 'straight'
-        elif speed < avg_speed * 0.7:
-            sector_type = 'corner'
-        else:
-            sector_type = 'medium'
-        
-        if sector_type != current_sector['type']:
-            if len(current_sector['speeds']) > 10:
-                sectors.append({
-                    'type': current_sector['type'],
-                    'start_idx': current_sector['start'],
-                    'end_idx': i,
-                    'avg_speed': np.mean(current_sector['speeds']),
-                    'length': points[i]['distance'] - points[current_sector['start']]['distance']
-                })
-            
-            current_sector = {'type': sector_type, 'start': i, 'speeds': [speed]}
-        else:
-            current_sector['speeds'].append(speed)
+    sectors = segment_sectors(distances, speeds)
     
     print(f"✓ Identified {len(sectors)} track sectors")
     for sector in sectors[:5]:
@@ -195,9 +221,7 @@ if __name__ == '__main__':
         
         # Save sector analysis
         track_data['sectors'] = sectors
-        output_file = Path('../public/tracks/monza_track_real.json')
-        with open(output_file, 'w') as f:
-            json.dump(track_data, f, indent=2)
+        save_track(track_data, TRACKS_DIR / 'monza_track_real.json')
         
         print("\n" + "=" * 60)
         print("✓ REAL F1 DATA FETCHED SUCCESSFULLY!")
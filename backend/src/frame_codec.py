@@ -0,0 +1,183 @@
+"""
+Delta frame encoding for the Race Oracle WebSocket stream
+Sends a full keyframe on scenario selection and every few seconds, and only
+the changed per-vehicle fields in between, as JSON or a compact binary layout.
+
+Protocols are negotiated through the WebSocket subprotocol header:
+    race-oracle.delta.json    keyframes + JSON deltas
+    race-oracle.delta.binary  keyframes (JSON text) + binary deltas
+Clients that request neither keep receiving full JSON snapshots.
+
+Binary delta layout (little-endian):
+    header   <BBHd   frame type, flags (bit 0: is_playing), vehicle count, time
+    vehicle  <BB     roster index (order of the last keyframe's vehicles), field mask
+             <f * n  one float32 per set mask bit, in DYNAMIC_FIELDS order
+                     (status and sector are sent as their index in ENUM_FIELDS;
+                     the last index of each stands for null)
+Playback deltas are frame type 2. Live simulation frames (mode "live") are
+frame type 3: the same layout with a <BH vehicle entry (16-bit mask) over
+LIVE_DYNAMIC_FIELDS.
+"""
+import json
+import struct
+import time
+from typing import Dict, Hashable, Optional, Union
+
+from scenario_store import STATUS_CODES
+from track_sectors import SECTOR_TYPES
+
+SUBPROTOCOLS = {
+    "race-oracle.delta.json": "json",
+    "race-oracle.delta.binary": "binary",
+}
+
+# Seconds between keyframes on an otherwise delta-encoded stream
+KEYFRAME_INTERVAL = 5.0
+
+# Per-vehicle fields that change during a race; everything else is roster data
+DYNAMIC_FIELDS = ["speed_kph", "lap", "track_position", "tire_wear", "tire_temp", "distance", "status", "sector"]
+
+# Live cars also move on the map, so their coordinates and heading are dynamic too
+LIVE_DYNAMIC_FIELDS = DYNAMIC_FIELDS + ["x", "y", "heading", "speed_ms"]
+
+# Dynamic string fields and the values they are encoded as indexes of
+# (live cars can retire, so the status enumeration also holds "DNF"; None is
+# last so a field can become null, e.g. sector on a track without sectors)
+ENUM_FIELDS = {"status": STATUS_CODES + ["DNF", None], "sector": SECTOR_TYPES + [None]}
+
+# Frame-level fields whose change forces a keyframe
+SESSION_FIELDS = ["scenario_id", "max_time", "playback_speed", "weather", "chaos_level"]
+
+BINARY_DELTA = 2
+BINARY_LIVE_DELTA = 3
+_HEADER = struct.Struct("<BBHd")
+_VEHICLE = struct.Struct("<BB")
+_LIVE_VEHICLE = struct.Struct("<BH")
+
+
+def dynamic_fields(frame: Dict):
+    """Fields that deltas of this frame carry"""
+    return LIVE_DYNAMIC_FIELDS if frame.get("mode") == "live" else DYNAMIC_FIELDS
+
+
+def negotiate(requested) -> Optional[str]:
+    """Pick the first supported subprotocol a client offered"""
+    for subprotocol in requested or []:
+        if subprotocol in SUBPROTOCOLS:
+            return subprotocol
+    return None
+
+
+def encode_keyframe(frame: Dict) -> str:
+    """Full frame, roster fields included"""
+    return json.dumps(dict(frame, type="KEYFRAME"), separators=(",", ":"), ensure_ascii=False)
+
+
+def vehicle_changes(previous: Dict, current: Dict) -> Dict[str, Dict]:
+    """driver_id -> {field: value} for dynamic fields that differ from the previous frame"""
+    changes = {}
+    fields = dynamic_fields(current)
+    for old, new in zip(previous["vehicles"], current["vehicles"]):
+        changed = {
+            field: new[field]
+            for field in fields
+            if field in new and new[field] != old.get(field)
+        }
+        if changed:
+            changes[new["driver_id"]] = changed
+    return changes
+
+
+def encode_delta_json(previous: Dict, current: Dict) -> str:
+    delta = {
+        "type": "DELTA",
+        "time": current["time"],
+        "is_playing": current["is_playing"],
+        "vehicles": vehicle_changes(previous, current),
+    }
+    return json.dumps(delta, separators=(",", ":"), ensure_ascii=False)
+
+
+def encode_delta_binary(previous: Dict, current: Dict) -> bytes:
+    changes = vehicle_changes(previous, current)
+    live = current.get("mode") == "live"
+    fields = LIVE_DYNAMIC_FIELDS if live else DYNAMIC_FIELDS
+    vehicle_struct = _LIVE_VEHICLE if live else _VEHICLE
+    frame_type = BINARY_LIVE_DELTA if live else BINARY_DELTA
+    parts = [_HEADER.pack(frame_type, 1 if current["is_playing"] else 0, len(changes), current["time"])]
+    for index, vehicle in enumerate(current["vehicles"]):
+        changed = changes.get(vehicle["driver_id"])
+        if not changed:
+            continue
+        mask = 0
+        values = []
+        for bit, field in enumerate(fields):
+            if field in changed:
+                mask |= 1 << bit
+                value = changed[field]
+                values.append(ENUM_FIELDS[field].index(value) if field in ENUM_FIELDS else value)
+        parts.append(vehicle_struct.pack(index, mask))
+        parts.append(struct.pack(f"<{len(values)}f", *values))
+    return b"".join(parts)
+
+
+def _needs_keyframe(previous: Optional[Dict], current: Dict) -> bool:
+    if previous is None:
+        return True
+    if any(previous.get(field) != current.get(field) for field in ["mode", *SESSION_FIELDS]):
+        return True
+    if len(previous["vehicles"]) != len(current["vehicles"]):
+        return True
+    if any(old["driver_id"] != new["driver_id"] for old, new in zip(previous["vehicles"], current["vehicles"])):
+        return True
+    # Values outside the enumerations can only be sent in a keyframe
+    return any(
+        field in v and v[field] not in values
+        for v in current["vehicles"]
+        for field, values in ENUM_FIELDS.items()
+    )
+
+
+class FrameEncoder:
+    """
+    Per-connection delta encoder.
+    Tracks the last frame sent so the next one can be encoded as a delta.
+    Connections that last received the same frame share encoded payloads via
+    the per-tick `cache` passed to encode().
+    """
+
+    def __init__(self, subprotocol: str, keyframe_interval: float = KEYFRAME_INTERVAL):
+        self.subprotocol = subprotocol
+        self.encoding = SUBPROTOCOLS[subprotocol]
+        self.keyframe_interval = keyframe_interval
+        self.reset()
+
+    def reset(self):
+        """Force the next frame to be a keyframe (e.g. after SCENARIO_SELECTED)"""
+        self.last_frame: Optional[Dict] = None
+        self.last_frame_key: Optional[Hashable] = None
+        self.last_keyframe_at = float("-inf")
+
+    def encode(self, frame: Dict, frame_key: Hashable, cache: Optional[Dict] = None, now: Optional[float] = None) -> Union[str, bytes]:
+        now = time.monotonic() if now is None else now
+        cache = {} if cache is None else cache
+
+        if now - self.last_keyframe_at >= self.keyframe_interval or _needs_keyframe(self.last_frame, frame):
+            cache_key = ("keyframe", frame_key)
+            payload = cache.get(cache_key)
+            if payload is None:
+                payload = cache[cache_key] = encode_keyframe(frame)
+            self.last_keyframe_at = now
+        else:
+            cache_key = (self.encoding, self.last_frame_key, frame_key)
+            payload = cache.get(cache_key)
+            if payload is None:
+                if self.encoding == "binary":
+                    payload = encode_delta_binary(self.last_frame, frame)
+                else:
+                    payload = encode_delta_json(self.last_frame, frame)
+                cache[cache_key] = payload
+
+        self.last_frame = frame
+        self.last_frame_key = frame_key
+        return payload
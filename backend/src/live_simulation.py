@@ -0,0 +1,163 @@
+"""
+Live server-side race simulation for Race Oracle
+Steps a physics Simulation on a fixed timestep driven by the monotonic
+clock. Each tick runs as many steps as the elapsed time calls for, at most
+MAX_CATCHUP_STEPS, so physics keeps pace with wall-clock time and a long
+stall drops time instead of running an unbounded burst of steps.
+"""
+import math
+import os
+from numbers import Real
+from pathlib import Path
+from typing import Dict, Optional
+
+from batch_runner import default_agents
+from simulation import Simulation
+from track_catalog import TRACK_CATALOG, TrackCatalog, track_id_for
+
+# Most physics steps run in one tick when the loop falls behind
+MAX_CATCHUP_STEPS = int(os.environ.get("RACE_ORACLE_MAX_CATCHUP_STEPS", "5"))
+
+DEFAULT_TRACK_ID = "monza"
+DEFAULT_DRIVERS = 5
+# Grid size default_agents() can fill, and the coarsest physics step accepted (seconds)
+MAX_DRIVERS = 20
+MAX_DT = 1.0
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, Real) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def validate_params(params) -> Dict:
+    """START_SIM params, checked before anything is built (ValueError describes the problem)"""
+    if not isinstance(params, dict):
+        raise ValueError("params must be an object")
+    for key in ("track_id", "track_file"):
+        if key in params and not isinstance(params[key], str):
+            raise ValueError(f"{key} must be a string")
+    if "dt" in params and not (_is_number(params["dt"]) and 0 < params["dt"] <= MAX_DT):
+        raise ValueError(f"dt must be a number in (0, {MAX_DT}]")
+    num_drivers = params.get("num_drivers", DEFAULT_DRIVERS)
+    if not (isinstance(num_drivers, int) and not isinstance(num_drivers, bool) and 1 <= num_drivers <= MAX_DRIVERS):
+        raise ValueError(f"num_drivers must be an integer between 1 and {MAX_DRIVERS}")
+    if "chaos_level" in params and not _is_number(params["chaos_level"]):
+        raise ValueError("chaos_level must be a number")
+    if "weather" in params and not isinstance(params["weather"], str):
+        raise ValueError("weather must be a string")
+    agents = params.get("agents")
+    if agents is not None:
+        if not isinstance(agents, list) or len(agents) > MAX_DRIVERS:
+            raise ValueError(f"agents must be a list of at most {MAX_DRIVERS} agent configs")
+        for agent in agents:
+            if not isinstance(agent, dict) or not isinstance(agent.get("driver_profile", {}), dict):
+                raise ValueError("each agent must be an object with an optional driver_profile object")
+    return params
+
+
+class FixedStepClock:
+    """Accumulates elapsed clock time and hands it out as whole steps"""
+
+    def __init__(self, step: float, max_steps: int = MAX_CATCHUP_STEPS):
+        self.step = step
+        self.max_steps = max_steps
+        self.last: Optional[float] = None
+        self.accumulator = 0.0
+        # Clock time skipped because more than max_steps were due
+        self.dropped = 0.0
+
+    def advance(self, now: float) -> int:
+        """Steps due at clock time now (the first call only starts the clock)"""
+        if self.last is None:
+            self.last = now
+            return 0
+        self.accumulator += now - self.last
+        self.last = now
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_steps:
+            self.dropped += (steps - self.max_steps) * self.step
+            steps = self.max_steps
+            self.accumulator = self.accumulator % self.step
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+
+class LiveSimulation:
+    """
+    A Simulation configured from START_SIM params and advanced by the
+    broadcast loop. params are Simulation.configure params plus "track_id"
+    or "track_file" (a catalog track), optional "dt" and "num_drivers"
+    (used when no agents are given).
+    """
+
+    def __init__(self, params: Dict, catalog: TrackCatalog = TRACK_CATALOG):
+        validate_params(params)
+        track_id = params.get("track_id")
+        if track_id is None and "track_file" in params:
+            track_id = track_id_for(Path(params["track_file"]))
+        track = catalog.get(track_id or DEFAULT_TRACK_ID)
+
+        self.track_id = track.id
+        self.simulation = Simulation()
+        self.simulation.configure(dict(
+            params,
+            track=track.name,
+            track_data=track.points,
+            track_index=track.index,
+            agents=params.get("agents") or default_agents(params.get("num_drivers", DEFAULT_DRIVERS)),
+        ))
+        if "dt" in params:
+            self.simulation.dt = params["dt"]
+        self.clock = FixedStepClock(self.simulation.dt)
+        self.steps = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self.simulation.is_running
+
+    def advance(self, now: float) -> int:
+        """Run the physics steps due at clock time now; returns how many ran"""
+        steps = self.clock.advance(now)
+        for _ in range(steps):
+            self.simulation.update()
+        self.steps += steps
+        return steps
+
+    def pause(self):
+        """Stop the clock; the time until the next advance is neither run nor dropped"""
+        self.clock.last = None
+
+    def frame(self) -> Dict:
+        """
+        State snapshot in the shape of a playback frame: vehicles keyed by
+        driver_id, with the lap-relative track_position, race distance and
+        scalar x/y the delta codec sends. Retirements ("DNF - Mechanical")
+        report status "DNF" and keep the reason in status_detail.
+        """
+        snapshot = self.simulation.get_state_snapshot()
+        track_length = self.simulation.track.total_length if self.simulation.track is not None else 0.0
+        for vehicle in snapshot["vehicles"]:
+            vehicle["driver_id"] = vehicle["name"]
+            vehicle["x"], vehicle["y"] = vehicle["position"]
+            vehicle["track_position"] = vehicle["distance"]
+            vehicle["distance"] = (vehicle["lap"] - 1) * track_length + vehicle["track_position"]
+            if vehicle["status"].startswith("DNF"):
+                vehicle["status_detail"] = vehicle["status"]
+                vehicle["status"] = "DNF"
+        return dict(
+            snapshot,
+            mode="live",
+            track_id=self.track_id,
+            is_playing=self.is_running,
+            dropped_time=round(self.clock.dropped, 3),
+        )
+
+    def set_weather(self, weather: str):
+        self.simulation.set_weather(weather)
+
+    def set_chaos(self, level: float):
+        self.simulation.set_chaos(level)
+
+    def stop(self):
+        self.simulation.stop()
@@ -4,14 +4,14 @@ Serves pre-generated race data
 """
 import asyncio
 import json
-from pathlib import Path
-from typing import Dict, List
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+import math
+import os
+import time
+from typing import Dict, List, Optional, Tuple, Union
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
-# Base directory (project root)
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
 try:
     # Try to use real track data first
     from race_data_real import RACE_SCENARIOS, get_race_snapshot, DRIVER_PROFILES
@@ -20,6 +20,17 @@ except:
     # Fallback to Monte Carlo only
     from race_data import RACE_SCENARIOS, get_race_snapshot, DRIVER_PROFILES
     print("⚠ Using Monte Carlo simulations (install fastf1 for real track data)")
+from columnar_format import MEDIA_TYPE as COLUMNAR_MEDIA_TYPE, encode_race_data, scenario_metadata
+from decimation import MAX_LOD, level_of_detail
+from frame_codec import FrameEncoder, negotiate
+from live_simulation import LiveSimulation
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, METRICS, SIZE_BUCKETS
+from profiler import PROFILER
+from monte_carlo import run_monte_carlo, shutdown_pool
+from response_cache import CachedResponse, ResponseCache, cached_response
+from scenario_cache import SCENARIO_CACHE
+from scenario_store import ColumnarRaceData, race_data_to_dict
+from track_catalog import TRACK_CATALOG
 
 app = FastAPI(title="Race Oracle API")
 
@@ -32,26 +43,167 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-connection send timeout during fan-out (one broadcast tick)
+SEND_TIMEOUT = 0.05
+# Consecutive timed-out sends after which a lagging client is disconnected
+MAX_SEND_TIMEOUTS = int(os.environ.get("RACE_ORACLE_MAX_SEND_TIMEOUTS", "40"))
+
+# Hot-path metrics (GET /metrics)
+TICK_SECONDS = METRICS.histogram("race_oracle_broadcast_tick_seconds", "Work time of one broadcast tick")
+TICK_JITTER_SECONDS = METRICS.histogram(
+    "race_oracle_broadcast_tick_jitter_seconds", "How late a broadcast tick started relative to its schedule"
+)
+TICK_OVERRUNS = METRICS.counter("race_oracle_broadcast_overruns_total", "Broadcast ticks whose work exceeded the tick interval")
+SNAPSHOT_SECONDS = METRICS.histogram("race_oracle_snapshot_build_seconds", "Time to build one race snapshot", ["mode"])
+LIVE_STEP_SECONDS = METRICS.histogram("race_oracle_live_step_seconds", "Physics time of one live simulation per tick")
+LIVE_STEPS = METRICS.counter("race_oracle_live_steps_total", "Physics steps run by live simulations")
+FRAME_BYTES = METRICS.histogram(
+    "race_oracle_frame_bytes", "Encoded size of each distinct outgoing frame", ["encoding"], buckets=SIZE_BUCKETS
+)
+FANOUT_SECONDS = METRICS.histogram("race_oracle_fanout_seconds", "Time to send one tick's frames to every connection")
+SENDS = METRICS.counter(
+    "race_oracle_sends_total", "WebSocket frame sends by outcome (timeout = not confirmed within SEND_TIMEOUT)", ["outcome"]
+)
+SLOW_DISCONNECTS = METRICS.counter(
+    "race_oracle_slow_disconnects_total", "Connections closed after MAX_SEND_TIMEOUTS consecutive send timeouts"
+)
+SESSION_ERRORS = METRICS.counter("race_oracle_session_errors_total", "Sessions paused because building their frame failed")
+CONNECTIONS = METRICS.gauge("race_oracle_active_connections", "Open WebSocket connections")
+CACHE_HITS = METRICS.counter("race_oracle_cache_hits_total", "Cache lookups served from the cache", ["cache"])
+CACHE_MISSES = METRICS.counter("race_oracle_cache_misses_total", "Cache lookups that had to build", ["cache"])
+
+
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        # Playback session of each connection; connections in a room share one
+        self.sessions: Dict[WebSocket, "PlaybackState"] = {}
+        self.rooms: Dict[str, "PlaybackState"] = {}
+        # Delta encoders of connections that negotiated a delta subprotocol
+        self.encoders: Dict[WebSocket, FrameEncoder] = {}
+        # Consecutive timed-out sends per connection
+        self.send_timeouts: Dict[WebSocket, int] = {}
+        # Timing of the most recent fan-out (reported by /stats/broadcast)
+        self.last_fanout: Dict = {}
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
+    async def connect(self, websocket: WebSocket, room: Optional[str] = None) -> "PlaybackState":
+        subprotocol = negotiate(websocket.scope.get("subprotocols"))
+        await websocket.accept(subprotocol=subprotocol)
         self.active_connections.append(websocket)
+        if subprotocol is not None:
+            self.encoders[websocket] = FrameEncoder(subprotocol)
+        if room is None:
+            session = PlaybackState()
+        else:
+            session = self.rooms.setdefault(room, PlaybackState(room))
+        self.sessions[websocket] = session
+        return session
 
     def disconnect(self, websocket: WebSocket):
+        if websocket not in self.sessions:
+            return
         self.active_connections.remove(websocket)
+        self.encoders.pop(websocket, None)
+        self.send_timeouts.pop(websocket, None)
+        session = self.sessions.pop(websocket, None)
+        if session is not None and session.room is not None and session not in self.sessions.values():
+            del self.rooms[session.room]
 
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
+    def session_groups(self) -> Dict["PlaybackState", List[WebSocket]]:
+        """Connections grouped by the playback session they watch"""
+        groups: Dict[PlaybackState, List[WebSocket]] = {}
+        for websocket, session in self.sessions.items():
+            groups.setdefault(session, []).append(websocket)
+        return groups
+
+    async def _send_payload(self, connection: WebSocket, payload: Union[str, bytes]) -> Optional[str]:
+        """
+        Send one pre-encoded frame; returns the failure kind, if any.
+        A "timeout" send was not confirmed in time; the frame may still have been
+        written, so it is not counted as dropped.
+        """
+        try:
+            if isinstance(payload, bytes):
+                await asyncio.wait_for(connection.send_bytes(payload), SEND_TIMEOUT)
+            else:
+                await asyncio.wait_for(connection.send_text(payload), SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            return "timeout"
+        except Exception:
+            return "error"
+        return None
+
+    async def fan_out(self, frames: List[Tuple[List[WebSocket], Union[dict, str, bytes]]]) -> List[WebSocket]:
+        """
+        Send each (connections, message) frame to its connections.
+        Dict messages are JSON-encoded once (str/bytes are sent as-is), and all
+        sends run concurrently with a per-send timeout so one slow socket
+        cannot hold up the rest. Returns the connections whose send failed or
+        timed out.
+        """
+        start = time.perf_counter()
+        sends = []
+        recipients: List[WebSocket] = []
+        measured = set()
+        with PROFILER.phase("encode"):
+            for connections, message in frames:
+                if isinstance(message, dict):
+                    message = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+                # Payloads shared between connections are counted once
+                if id(message) not in measured:
+                    measured.add(id(message))
+                    if isinstance(message, bytes):
+                        FRAME_BYTES.observe(len(message), encoding="binary")
+                    else:
+                        FRAME_BYTES.observe(len(message.encode()), encoding="text")
+                recipients += connections
+                sends += [self._send_payload(connection, message) for connection in connections]
+        # The sends run as other tasks while this tick awaits them
+        with PROFILER.waiting():
+            results = await asyncio.gather(*sends)
+        FANOUT_SECONDS.observe(time.perf_counter() - start)
+        await self._drop_laggards(recipients, results)
+        for outcome in ("timeout", "error"):
+            if results.count(outcome):
+                SENDS.inc(results.count(outcome), outcome=outcome)
+        SENDS.inc(results.count(None), outcome="ok")
+        self.last_fanout = {
+            "frames": len(frames),
+            "sends": len(sends),
+            "timed_out": results.count("timeout"),
+            "failed": results.count("error"),
+            "seconds": time.perf_counter() - start,
+        }
+        return [connection for connection, outcome in zip(recipients, results) if outcome is not None]
+
+    async def _drop_laggards(self, connections: List[WebSocket], results: List[Optional[str]]):
+        """Track consecutive send timeouts and close clients that keep falling behind"""
+        laggards = []
+        for connection, outcome in zip(connections, results):
+            if outcome == "timeout":
+                self.send_timeouts[connection] = self.send_timeouts.get(connection, 0) + 1
+                if self.send_timeouts[connection] >= MAX_SEND_TIMEOUTS:
+                    laggards.append(connection)
+            elif outcome is None:
+                self.send_timeouts.pop(connection, None)
+        for connection in laggards:
+            SLOW_DISCONNECTS.inc()
+            self.disconnect(connection)
             try:
-                await connection.send_json(message)
-            except:
+                # 1013: try again later
+                await asyncio.wait_for(connection.close(code=1013), SEND_TIMEOUT)
+            except Exception:
                 pass
 
+    async def send(self, connections: List[WebSocket], message: dict):
+        await self.fan_out([(connections, message)])
+
+    async def broadcast(self, message: dict):
+        await self.send(self.active_connections, message)
+
 manager = ConnectionManager()
+CONNECTIONS.set_function(lambda: len(manager.active_connections))
 
 
 @app.get("/")
@@ -59,86 +211,304 @@ async def root():
     return {"message": "Race Oracle API", "status": "running", "scenarios": len(RACE_SCENARIOS)}
 
 
-@app.get("/data/tracks")
-async def get_tracks():
-    """Get list of available tracks"""
-    tracks_dir = BASE_DIR / "public" / "tracks"
-    if not tracks_dir.exists():
-        return JSONResponse({"tracks": []})
-    
-    track_files = list(tracks_dir.glob("*_track.json"))
-    tracks = []
-    
-    for track_file in track_files:
-        try:
-            with open(track_file, 'r') as f:
-                data = json.load(f)
-                tracks.append({
-                    "name": data.get("track_name", track_file.stem),
-                    "file": track_file.name,
-                    "length": data.get("total_length", 0),
-                })
-        except:
-            pass
-    
-    return {"tracks": tracks}
+@app.get("/metrics")
+async def get_metrics():
+    """Runtime metrics in the Prometheus text format"""
+    return Response(METRICS.render(), media_type=METRICS_CONTENT_TYPE)
 
 
-@app.get("/data/drivers")
-async def get_drivers():
-    """Get driver profiles"""
-    return {"drivers": DRIVER_PROFILES}
+# Admin endpoints require this token in X-Admin-Token and are disabled without it
+# (RACE_ORACLE_PROFILE=1 still enables the profiler at startup)
+ADMIN_TOKEN = os.environ.get("RACE_ORACLE_ADMIN_TOKEN")
 
 
-@app.get("/data/scenarios")
-async def get_scenarios():
-    """Get available race scenarios"""
+def _admin_denied(request: Request) -> Optional[JSONResponse]:
+    if not ADMIN_TOKEN:
+        return JSONResponse({"error": "Admin endpoints are disabled (RACE_ORACLE_ADMIN_TOKEN is not set)"},
+                            status_code=403)
+    if request.headers.get("x-admin-token") != ADMIN_TOKEN:
+        return JSONResponse({"error": "Admin token required"}, status_code=403)
+    return None
+
+
+@app.get("/admin/profiler")
+async def get_profiler(request: Request):
+    """Profiler settings and the most recent slow ticks with their phase breakdown"""
+    return _admin_denied(request) or PROFILER.status()
+
+
+@app.post("/admin/profiler")
+async def set_profiler(request: Request, enabled: Optional[bool] = None,
+                       threshold_ms: Optional[float] = None, reset: bool = False):
+    """Turn tick profiling on or off, change the slow-tick threshold, or clear samples"""
+    denied = _admin_denied(request)
+    if denied:
+        return denied
+    if reset:
+        PROFILER.reset()
+    if threshold_ms is not None:
+        PROFILER.threshold_ms = threshold_ms
+    if enabled is True:
+        PROFILER.enable()
+    elif enabled is False:
+        PROFILER.disable()
+    return PROFILER.status()
+
+
+@app.get("/admin/profiler/collapsed")
+async def get_profiler_stacks(request: Request):
+    """Collapsed stacks of slow ticks (input for flamegraph.pl / speedscope)"""
+    return _admin_denied(request) or Response(PROFILER.collapsed(), media_type="text/plain")
+
+
+@app.get("/stats/broadcast")
+async def get_broadcast_stats():
+    """Fan-out timing of the last broadcast tick"""
+    return {"connections": len(manager.active_connections), "last_fanout": manager.last_fanout}
+
+
+# Pre-encoded REST payloads, rebuilt when the files they depend on change
+response_cache = ResponseCache()
+# Monte Carlo results get their own small cache so distinct queries cannot evict scenarios
+monte_carlo_cache = ResponseCache(max_entries=16)
+
+for _name, _cache in (("scenario_registry", RACE_SCENARIOS), ("scenario_disk", SCENARIO_CACHE),
+                      ("response", response_cache), ("monte_carlo", monte_carlo_cache)):
+    CACHE_HITS.set_function(lambda cache=_cache: cache.hits, cache=_name)
+    CACHE_MISSES.set_function(lambda cache=_cache: cache.misses, cache=_name)
+
+
+def _tracks_payload():
+    # Catalog metadata only; no track geometry is parsed here
+    return {"tracks": [track.summary() for track in TRACK_CATALOG.tracks()]}
+
+
+def _scenarios_payload():
     scenarios_list = []
-    for scenario in RACE_SCENARIOS:
+    # Served from metadata only; no telemetry is generated here
+    for scenario in RACE_SCENARIOS.metadata:
         scenarios_list.append({
             "scenario_id": scenario["scenario_id"],
             "num_drivers": scenario["num_drivers"],
             "num_laps": scenario["num_laps"],
             "aggression_factor": scenario["aggression_factor"],
             "drivers": [DRIVER_PROFILES[d]["name"] for d in scenario["drivers"]],
+            "track_id": scenario["track_id"],
         })
     return {"scenarios": scenarios_list}
 
 
-@app.get("/data/scenario/{scenario_id}")
-async def get_scenario_data(scenario_id: int):
-    """Get full data for a specific scenario"""
-    if scenario_id < 0 or scenario_id >= len(RACE_SCENARIOS):
-        return JSONResponse({"error": "Scenario not found"}, status_code=404)
-    
-    scenario = RACE_SCENARIOS[scenario_id]
-    
-    # Load track data
-    track_path = BASE_DIR / "public" / "tracks" / "monza_track.json"
-    track_data = {}
-    if track_path.exists():
-        with open(track_path, 'r') as f:
-            track_data = json.load(f)
-    
+def _scenario_track(scenario):
+    """Geometry of the scenario's track (empty if it left the catalog)"""
+    try:
+        return TRACK_CATALOG.get(scenario["track_id"]).load()
+    except KeyError:
+        return {}
+
+
+def _scenario_track_paths(scenario_id: int):
+    track_id = RACE_SCENARIOS.metadata[scenario_id]["track_id"]
+    return [TRACK_CATALOG.get(track_id).path] if track_id in TRACK_CATALOG else []
+
+
+def _select_race_data(scenario, lod: int = 0, t0: Optional[float] = None, t1: Optional[float] = None,
+                      driver_ids: Optional[List[str]] = None):
+    """Only the requested drivers, time window and level of detail (columns stay unmaterialized)"""
+    race_data = scenario["race_data"]
+    if driver_ids is not None:
+        race_data = ColumnarRaceData({d: race_data[d] for d in driver_ids})
+    if lod or t0 is not None or t1 is not None:
+        race_data = level_of_detail(race_data, lod, t0, t1)
+    return race_data
+
+
+def _scenario_header(scenario, lod: int):
     return {
         "scenario_id": scenario["scenario_id"],
         "num_drivers": scenario["num_drivers"],
         "num_laps": scenario["num_laps"],
         "aggression_factor": scenario["aggression_factor"],
         "drivers": scenario["drivers"],
-        "track": track_data,
-        "race_data": scenario["race_data"],
+        "track_id": scenario["track_id"],
+        "lod": lod,
     }
 
 
-# Simulation playback state
+def _scenario_payload(scenario_id: int, lod: int = 0, t0: Optional[float] = None, t1: Optional[float] = None,
+                      driver_ids: Optional[List[str]] = None, fields: Optional[List[str]] = None,
+                      include_track: bool = True):
+    # Telemetry is generated here on first request for the scenario
+    scenario = RACE_SCENARIOS.get(scenario_id)
+    race_data = _select_race_data(scenario, lod, t0, t1, driver_ids)
+    
+    payload = _scenario_header(scenario, lod)
+    if include_track:
+        payload["track"] = _scenario_track(scenario)
+    payload["race_data"] = race_data_to_dict(race_data, fields)
+    return payload
+
+
+def _scenario_columnar(scenario_id: int, lod: int = 0, t0: Optional[float] = None, t1: Optional[float] = None,
+                       driver_ids: Optional[List[str]] = None, fields: Optional[List[str]] = None,
+                       compress: bool = False) -> bytes:
+    scenario = RACE_SCENARIOS.get(scenario_id)
+    race_data = _select_race_data(scenario, lod, t0, t1, driver_ids)
+    metadata = dict(scenario_metadata(scenario), lod=lod)
+    return encode_race_data(race_data, metadata, compress, fields)
+
+
+# Samples per NDJSON telemetry line
+NDJSON_CHUNK = 1000
+
+
+def _scenario_ndjson(scenario_id: int, lod: int = 0, t0: Optional[float] = None, t1: Optional[float] = None,
+                     driver_ids: Optional[List[str]] = None, fields: Optional[List[str]] = None,
+                     include_track: bool = True):
+    """
+    Scenario as NDJSON lines: a header, the track, then each driver's
+    telemetry in chunks of NDJSON_CHUNK samples. Only one chunk is
+    materialized at a time.
+    """
+    scenario = RACE_SCENARIOS.get(scenario_id)
+    race_data = _select_race_data(scenario, lod, t0, t1, driver_ids)
+    
+    yield json.dumps(dict(_scenario_header(scenario, lod), type="scenario")) + "\n"
+    if include_track:
+        yield json.dumps({"type": "track", "track": _scenario_track(scenario)}) + "\n"
+    for driver_id, telemetry in race_data.items():
+        for start in range(0, len(telemetry), NDJSON_CHUNK):
+            points = telemetry.take(slice(start, start + NDJSON_CHUNK)).to_records(fields)
+            yield json.dumps({"type": "telemetry", "driver_id": driver_id, "points": points}) + "\n"
+    yield json.dumps({"type": "end"}) + "\n"
+
+
+@app.get("/data/tracks")
+async def get_tracks(request: Request):
+    """Get list of available tracks"""
+    entry = response_cache.get("tracks", _tracks_payload, lambda: [track.path for track in TRACK_CATALOG.tracks()])
+    return cached_response(request, entry)
+
+
+@app.get("/data/drivers")
+async def get_drivers(request: Request):
+    """Get driver profiles"""
+    entry = response_cache.get("drivers", lambda: {"drivers": DRIVER_PROFILES})
+    return cached_response(request, entry)
+
+
+@app.get("/data/scenarios")
+async def get_scenarios(request: Request):
+    """Get available race scenarios"""
+    entry = response_cache.get("scenarios", _scenarios_payload)
+    return cached_response(request, entry)
+
+
+# The representation depends on Accept (JSON, NDJSON or columnar) as well as on Accept-Encoding
+SCENARIO_VARY = "Accept, Accept-Encoding"
+
+
+@app.get("/data/scenario/{scenario_id}")
+async def get_scenario_data(scenario_id: int, request: Request, lod: int = 0,
+                            t0: Optional[float] = None, t1: Optional[float] = None,
+                            drivers: Optional[str] = None, fields: Optional[str] = None,
+                            track: bool = True, format: str = "json", compress: bool = False):
+    """
+    Get data for a specific scenario.
+    lod=0 is full resolution; higher levels drop samples that interpolation
+    reproduces within a growing error bound. t0/t1 restrict to a time window,
+    drivers/fields (comma-separated) to a subset; track=false omits the
+    track geometry. format=ndjson (or
+    Accept: application/x-ndjson) streams the response line by line;
+    format=columnar (or Accept: application/vnd.race-oracle.columnar)
+    returns typed binary columns, zlib-compressed per column with compress=true.
+    """
+    if scenario_id < 0 or scenario_id >= len(RACE_SCENARIOS):
+        return JSONResponse({"error": "Scenario not found"}, status_code=404)
+    if not 0 <= lod <= MAX_LOD:
+        return JSONResponse({"error": f"lod must be between 0 and {MAX_LOD}"}, status_code=400)
+    driver_ids = drivers.split(",") if drivers else None
+    if driver_ids is not None:
+        unknown = [d for d in driver_ids if d not in RACE_SCENARIOS.metadata[scenario_id]["drivers"]]
+        if unknown:
+            return JSONResponse({"error": f"Drivers not in scenario: {', '.join(unknown)}"}, status_code=400)
+    field_names = fields.split(",") if fields else None
+    
+    accept = request.headers.get("accept", "")
+    if format == "columnar" or COLUMNAR_MEDIA_TYPE in accept:
+        build = lambda: _scenario_columnar(scenario_id, lod, t0, t1, driver_ids, field_names, compress)
+        if any(arg is not None for arg in (t0, t1, driver_ids, field_names)):
+            entry = await asyncio.to_thread(lambda: CachedResponse(build(), (), COLUMNAR_MEDIA_TYPE))
+        else:
+            entry = await asyncio.to_thread(
+                response_cache.get,
+                ("scenario", scenario_id, lod, "columnar", compress),
+                build,
+                media_type=COLUMNAR_MEDIA_TYPE,
+            )
+        return cached_response(request, entry, SCENARIO_VARY)
+    
+    if format == "ndjson" or "application/x-ndjson" in accept:
+        # Starlette iterates the sync generator in a worker thread
+        return StreamingResponse(
+            _scenario_ndjson(scenario_id, lod, t0, t1, driver_ids, field_names, track),
+            media_type="application/x-ndjson",
+            headers={"Vary": SCENARIO_VARY},
+        )
+    
+    build = lambda: _scenario_payload(scenario_id, lod, t0, t1, driver_ids, field_names, track)
+    if not track or any(arg is not None for arg in (t0, t1, driver_ids, field_names)):
+        # Windows and subsets are ad hoc; keep them out of the shared cache
+        entry = await asyncio.to_thread(lambda: CachedResponse.from_payload(build(), ()))
+        return cached_response(request, entry, SCENARIO_VARY)
+    
+    # Building (generation + encoding + compression) runs off the event loop
+    entry = await asyncio.to_thread(
+        response_cache.get,
+        ("scenario", scenario_id, lod),
+        build,
+        lambda: _scenario_track_paths(scenario_id),
+    )
+    return cached_response(request, entry, SCENARIO_VARY)
+
+
+# Largest ensemble one HTTP request may ask for (the CLI is not capped)
+MC_MAX_RUNS = int(os.environ.get("RACE_ORACLE_MC_MAX_RUNS", "100000"))
+MC_MAX_LAPS = int(os.environ.get("RACE_ORACLE_MC_MAX_LAPS", "80"))
+
+
+@app.get("/data/monte-carlo")
+async def get_monte_carlo(request: Request, runs: int = 10000, laps: int = 5,
+                          drivers: Optional[str] = None, seed: int = 0):
+    """
+    Outcome probabilities from a seeded Monte Carlo ensemble (reproducible per seed).
+    Driver ids are those of race_data's full grid, not the real-track scenarios' drivers.
+    """
+    if runs > MC_MAX_RUNS or laps > MC_MAX_LAPS:
+        return JSONResponse({"error": f"runs must be at most {MC_MAX_RUNS} and laps at most {MC_MAX_LAPS}"},
+                            status_code=422)
+    driver_ids = tuple(drivers.split(",")) if drivers else None
+    try:
+        entry = await asyncio.to_thread(
+            monte_carlo_cache.get,
+            ("monte_carlo", driver_ids, laps, runs, seed),
+            lambda: run_monte_carlo(driver_ids, laps, runs, seed),
+        )
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    return cached_response(request, entry)
+
+
+# Simulation playback state (one per connection, or shared by a room)
 class PlaybackState:
-    def __init__(self):
+    def __init__(self, room: Optional[str] = None):
+        self.room = room
         self.scenario_id = 0
         self.current_time = 0.0
         self.is_playing = False
         self.playback_speed = 1.0
         self.max_time = 0.0
+        # Server-side physics simulation, when the session runs one (START_SIM)
+        self.live: Optional[LiveSimulation] = None
     
     def get_max_time(self):
         """Get total duration of current scenario"""
@@ -150,15 +520,15 @@ class PlaybackState:
                 max_time = max(max_time, telemetry[-1]["time"])
         return max_time
 
-playback = PlaybackState()
-
 
 @app.websocket("/ws/simulation")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for simulation playback"""
-    global playback
-    
-    await manager.connect(websocket)
+    """
+    WebSocket endpoint for simulation playback.
+    Each connection controls its own playback; connections opened with the
+    same ?room= query parameter share (and jointly control) one session.
+    """
+    playback = await manager.connect(websocket, websocket.query_params.get("room"))
     
     try:
         while True:
@@ -169,6 +539,9 @@ async def websocket_endpoint(websocket: WebSocket):
             if message_type == "SELECT_SCENARIO":
                 scenario_id = data.get("scenario_id", 0)
                 if 0 <= scenario_id < len(RACE_SCENARIOS):
+                    # Materialize the scenario's telemetry before it is played back
+                    await asyncio.to_thread(RACE_SCENARIOS.get, scenario_id)
+                    playback.live = None
                     playback.scenario_id = scenario_id
                     playback.current_time = 0.0
                     playback.is_playing = False
@@ -179,6 +552,13 @@ async def websocket_endpoint(websocket: WebSocket):
                         "scenario_id": scenario_id,
                         "max_time": playback.max_time,
                     })
+                    
+                    # Delta-protocol clients get the new roster as a keyframe
+                    encoder = manager.encoders.get(websocket)
+                    if encoder is not None:
+                        encoder.reset()
+                        frame_key, frame = await _build_frame(playback, {})
+                        await websocket.send_text(encoder.encode(frame, frame_key))
             
             elif message_type == "PLAY":
                 playback.is_playing = True
@@ -186,6 +566,8 @@ async def websocket_endpoint(websocket: WebSocket):
             
             elif message_type == "PAUSE":
                 playback.is_playing = False
+                if playback.live is not None:
+                    playback.live.pause()
                 await websocket.send_json({"type": "PAUSED"})
             
             elif message_type == "SEEK":
@@ -196,6 +578,52 @@ async def websocket_endpoint(websocket: WebSocket):
                 playback.playback_speed = data.get("speed", 1.0)
                 await websocket.send_json({"type": "SPEED_CHANGED", "speed": playback.playback_speed})
             
+            elif message_type == "START_SIM":
+                try:
+                    # Track geometry and index load off the event loop
+                    live = await asyncio.to_thread(LiveSimulation, data.get("params", {}))
+                except (KeyError, TypeError, ValueError) as e:
+                    await websocket.send_json({"type": "ERROR", "message": e.args[0] if e.args else str(e)})
+                    continue
+                playback.live = live
+                playback.is_playing = True
+                encoder = manager.encoders.get(websocket)
+                if encoder is not None:
+                    encoder.reset()
+                await websocket.send_json({
+                    "type": "SIM_STARTED",
+                    "track_id": live.track_id,
+                    "vehicles": len(live.simulation.vehicles),
+                    "dt": live.simulation.dt,
+                })
+            
+            elif message_type == "STOP_SIM":
+                if playback.live is not None:
+                    playback.live.stop()
+                    playback.live = None
+                await websocket.send_json({"type": "SIM_STOPPED"})
+            
+            elif message_type in ("SET_WEATHER", "SET_CHAOS"):
+                if playback.live is None:
+                    await websocket.send_json({"type": "ERROR", "message": "No live simulation running"})
+                elif message_type == "SET_WEATHER":
+                    weather = data.get("payload", "Dry")
+                    if not isinstance(weather, str):
+                        await websocket.send_json({"type": "ERROR", "message": "Weather must be a string"})
+                        continue
+                    playback.live.set_weather(weather)
+                    await websocket.send_json({"type": "WEATHER_CHANGED", "weather": playback.live.simulation.global_weather})
+                else:
+                    try:
+                        level = float(data.get("payload", 0.0))
+                    except (TypeError, ValueError):
+                        level = math.nan
+                    if not math.isfinite(level):
+                        await websocket.send_json({"type": "ERROR", "message": "Chaos level must be a number"})
+                        continue
+                    playback.live.set_chaos(level)
+                    await websocket.send_json({"type": "CHAOS_CHANGED", "chaos_level": playback.live.simulation.chaos_level})
+            
     except WebSocketDisconnect:
         manager.disconnect(websocket)
     except Exception as e:
@@ -203,36 +631,158 @@ async def websocket_endpoint(websocket: WebSocket):
         manager.disconnect(websocket)
 
 
+# Sessions whose playback times fall in the same quantum share one snapshot;
+# below 1x the quantum shrinks with the speed so slow motion stays smooth
+SNAPSHOT_QUANTUM = 0.05  # seconds of race time at 1x
+
+# Frames sent per second (live simulations step on their own fixed timestep)
+BROADCAST_HZ = float(os.environ.get("RACE_ORACLE_BROADCAST_HZ", "20"))
+
+
+def _advance(playback: PlaybackState, elapsed: float):
+    """Advance a playing session by the wall-clock time since the last tick"""
+    playback.current_time += elapsed * playback.playback_speed
+    
+    # Check if we've reached the end
+    if playback.current_time >= playback.max_time:
+        playback.current_time = playback.max_time
+        playback.is_playing = False
+
+
+async def _build_frame(playback: PlaybackState, snapshots: Dict[Tuple, dict]) -> Tuple[Tuple, dict]:
+    """
+    Frame for a session's current time, plus the key identifying its content.
+    Snapshots are shared through `snapshots` by sessions in the same quantum.
+    """
+    step = SNAPSHOT_QUANTUM * min(1.0, playback.playback_speed) or SNAPSHOT_QUANTUM
+    quantum = round(playback.current_time / step)
+    snapshot_key = (playback.scenario_id, step, quantum)
+    frame_key = snapshot_key + (playback.is_playing, playback.max_time, playback.playback_speed)
+    
+    # Get race snapshot
+    snapshot = snapshots.get(snapshot_key)
+    if snapshot is None:
+        if RACE_SCENARIOS.is_cached(playback.scenario_id):
+            scenario = RACE_SCENARIOS[playback.scenario_id]
+        else:
+            # An evicted scenario is regenerated off the event loop
+            with PROFILER.waiting():
+                scenario = await asyncio.to_thread(RACE_SCENARIOS.get, playback.scenario_id)
+        with SNAPSHOT_SECONDS.time(mode="playback"):
+            snapshot = get_race_snapshot(scenario, quantum * step, interpolate=True)
+        snapshots[snapshot_key] = snapshot
+    
+    # Add metadata
+    frame = dict(
+        snapshot,
+        scenario_id=playback.scenario_id,
+        is_playing=playback.is_playing,
+        max_time=playback.max_time,
+        playback_speed=playback.playback_speed,
+    )
+    return frame_key, frame
+
+
+async def _session_frame(playback: PlaybackState, now: float, elapsed: float,
+                         frames: Dict[Tuple, dict], snapshots: Dict[Tuple, dict]) -> Tuple[Optional[Tuple], Optional[dict]]:
+    """Advance a playing session and return its frame key and frame (None, None when it sends nothing)"""
+    if playback.live is not None:
+        if not playback.live.is_running:
+            return None, None
+        with LIVE_STEP_SECONDS.time(), PROFILER.phase("physics"):
+            LIVE_STEPS.inc(playback.live.advance(now))
+        frame_key = ("live", id(playback.live), playback.live.steps)
+        if frame_key in frames:
+            return frame_key, frames[frame_key]
+        with SNAPSHOT_SECONDS.time(mode="live"), PROFILER.phase("snapshot"):
+            return frame_key, playback.live.frame()
+    
+    _advance(playback, elapsed)
+    with PROFILER.phase("snapshot"):
+        return await _build_frame(playback, snapshots)
+
+
 # Background task to broadcast race state
 async def broadcast_loop():
-    """Continuously broadcast race state to all connected clients"""
+    """
+    Continuously broadcast race state to every playing session.
+    Sessions are grouped by (scenario, time quantum, playback flags) so each
+    distinct frame is built once per tick however many viewers share it.
+    Delta-protocol connections get per-connection payloads, shared between
+    connections that last received the same frame.
+    Ticks are scheduled on the loop's monotonic clock at BROADCAST_HZ;
+    playback advances by the measured time between ticks, and a late tick
+    is followed immediately by the next rather than by a full interval.
+    """
+    loop = asyncio.get_running_loop()
+    interval = 1.0 / BROADCAST_HZ
+    last_tick = next_tick = loop.time()
     while True:
         try:
-            if playback.is_playing and RACE_SCENARIOS:
-                # Update time
-                playback.current_time += 0.05 * playback.playback_speed
-                
-                # Check if we've reached the end
-                if playback.current_time >= playback.max_time:
-                    playback.current_time = playback.max_time
-                    playback.is_playing = False
-                
-                # Get race snapshot
-                scenario = RACE_SCENARIOS[playback.scenario_id]
-                snapshot = get_race_snapshot(scenario, playback.current_time)
-                
-                # Add metadata
-                snapshot["scenario_id"] = playback.scenario_id
-                snapshot["is_playing"] = playback.is_playing
-                snapshot["max_time"] = playback.max_time
-                snapshot["playback_speed"] = playback.playback_speed
-                
-                await manager.broadcast(snapshot)
+            # Stack samples are kept for ticks over the profiler threshold (when enabled)
+            with PROFILER.tick("broadcast"):
+                now = loop.time()
+                TICK_JITTER_SECONDS.observe(max(0.0, now - next_tick))
+                elapsed, last_tick = now - last_tick, now
+                frames: Dict[Tuple, dict] = {}
+                recipients: Dict[Tuple, List[WebSocket]] = {}
+                snapshots: Dict[Tuple, dict] = {}
+            
+                for playback, connections in manager.session_groups().items():
+                    if not playback.is_playing:
+                        continue
+                    try:
+                        frame_key, frame = await _session_frame(playback, now, elapsed, frames, snapshots)
+                    except Exception as e:
+                        # One broken session is paused; the others keep playing
+                        print(f"⚠ Session error, pausing it: {e!r}")
+                        SESSION_ERRORS.inc()
+                        playback.is_playing = False
+                        continue
+                    if frame_key is None:
+                        continue
+                    if frame_key not in frames:
+                        frames[frame_key] = frame
+                        recipients[frame_key] = []
+                    recipients[frame_key].extend(connections)
             
-            await asyncio.sleep(0.05)  # 20 FPS
+                outgoing = []
+                payloads: Dict = {}
+                now = time.monotonic()
+                with PROFILER.phase("encode"):
+                    for frame_key, frame in frames.items():
+                        full_frame_connections = []
+                        for connection in recipients[frame_key]:
+                            encoder = manager.encoders.get(connection)
+                            if encoder is None:
+                                full_frame_connections.append(connection)
+                            else:
+                                outgoing.append(([connection], encoder.encode(frame, frame_key, payloads, now)))
+                        if full_frame_connections:
+                            outgoing.append((full_frame_connections, frame))
+            
+                if outgoing:
+                    # A delta built on a frame the client may not have received would corrupt its
+                    # state, so connections whose send failed get a keyframe next
+                    for connection in await manager.fan_out(outgoing):
+                        encoder = manager.encoders.get(connection)
+                        if encoder is not None:
+                            encoder.reset()
         except Exception as e:
             print(f"Broadcast error: {e}")
-            await asyncio.sleep(0.05)
+        
+        duration = loop.time() - last_tick
+        TICK_SECONDS.observe(duration)
+        if duration > interval:
+            TICK_OVERRUNS.inc()
+        
+        next_tick += interval
+        delay = next_tick - loop.time()
+        if delay < 0:
+            # Behind schedule: skip the missed ticks instead of sending a burst
+            next_tick = loop.time()
+            delay = 0
+        await asyncio.sleep(delay)
 
 
 # Start broadcast loop on startup
@@ -241,6 +791,11 @@ async def startup_event():
     asyncio.create_task(broadcast_loop())
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    shutdown_pool()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,245 @@
+"""
+Monte Carlo outcome engine for Race Oracle
+Runs large ensembles of seeded races with the lap-time model of
+race_data_real (consistency variation, aggression, tire degradation) and
+aggregates outcomes online, without keeping any telemetry.
+
+Runs are split into fixed-size chunks. Chunk i, driver d draws from its own
+stream SeedSequence(seed, spawn_key=(i, d)) and chunks are merged in order,
+so results are bit-identical for a given seed whatever the worker count.
+Parallel runs share one long-lived pool of spawned worker processes.
+
+Drivers come from race_data's 20-driver grid, which has a base lap time per
+driver; the real-track scenarios use race_data_real's smaller table instead.
+
+Usage:
+    python monte_carlo.py --runs 100000 --laps 5 --drivers VER,HAM,NOR,LEC
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from race_data import DRIVER_PROFILES
+
+# Runs per chunk; part of the result definition, so changing it changes results
+CHUNK_RUNS = 4096
+# Finishing-time histogram resolution per driver (quantiles are exact to one bin)
+TIME_BINS = 1024
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+MAX_RUNS = 1_000_000
+
+DEFAULT_WORKERS = int(os.environ.get("RACE_ORACLE_MC_WORKERS", "0")) or os.cpu_count() or 1
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_pool(workers: int = DEFAULT_WORKERS) -> ProcessPoolExecutor:
+    """
+    The shared worker pool, created on first use with at least `workers`
+    processes. Workers are spawned rather than forked, so they never inherit
+    the server's threads or event loop.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool_workers = max(workers, DEFAULT_WORKERS)
+            _pool = ProcessPoolExecutor(max_workers=_pool_workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool, _pool_workers = None, 0
+
+
+def lap_model(driver_ids: List[str], num_laps: int) -> Dict[str, np.ndarray]:
+    """Per-driver base lap time, consistency spread and per-lap degradation factor"""
+    base = []
+    spread = []
+    degradation = []
+    laps = np.arange(num_laps, dtype=np.float64)
+    for driver_id in driver_ids:
+        profile = DRIVER_PROFILES[driver_id]
+        base_time = profile["base_lap_time"]
+        # Apply aggression to base time
+        if profile["aggression"] > 0.9:
+            base_time *= 0.98
+        elif profile["aggression"] < 0.8:
+            base_time *= 1.02
+        base.append(base_time)
+        spread.append((1.0 - profile["consistency"]) * 2.0)
+        degradation.append(1.0 + laps * (1.0 - profile["tire_management"]) * 0.15)
+    base = np.array(base)
+    spread = np.array(spread)
+    degradation = np.array(degradation).reshape(len(driver_ids), num_laps)
+
+    # Fastest/slowest possible race time, used as the histogram range
+    lower = base * ((1.0 - spread)[:, None] * degradation).sum(axis=1)
+    upper = base * ((1.0 + spread)[:, None] * degradation).sum(axis=1)
+    upper = np.maximum(upper, lower + 1e-6)
+    return {"base": base, "spread": spread, "degradation": degradation, "lower": lower, "upper": upper}
+
+
+def _run_chunk(task) -> Dict[str, np.ndarray]:
+    """Simulate one chunk of races and reduce it to counts and sums"""
+    seed, chunk_index, runs, model = task
+    base, spread, degradation = model["base"], model["spread"], model["degradation"]
+    num_drivers, num_laps = degradation.shape
+
+    finish_times = np.empty((runs, num_drivers))
+    for d in range(num_drivers):
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index, d)))
+        variation = rng.uniform(-spread[d], spread[d], size=(runs, num_laps))
+        finish_times[:, d] = (base[d] * (1.0 + variation) * degradation[d]).sum(axis=1)
+
+    # Position of each driver in each run (0 = winner; ties keep driver order)
+    order = np.argsort(finish_times, axis=1, kind="stable")
+    positions = np.empty_like(order)
+    positions[np.arange(runs)[:, None], order] = np.arange(num_drivers)
+
+    lower, upper = model["lower"], model["upper"]
+    bins = ((finish_times - lower) / (upper - lower) * TIME_BINS).astype(np.int64)
+    np.clip(bins, 0, TIME_BINS - 1, out=bins)
+
+    position_counts = np.zeros((num_drivers, num_drivers), dtype=np.int64)
+    time_counts = np.zeros((num_drivers, TIME_BINS), dtype=np.int64)
+    for d in range(num_drivers):
+        position_counts[d] = np.bincount(positions[:, d], minlength=num_drivers)
+        time_counts[d] = np.bincount(bins[:, d], minlength=TIME_BINS)
+
+    return {
+        "position_counts": position_counts,
+        "time_counts": time_counts,
+        "time_sum": finish_times.sum(axis=0),
+        "time_sq_sum": (finish_times ** 2).sum(axis=0),
+        "time_min": finish_times.min(axis=0),
+        "time_max": finish_times.max(axis=0),
+    }
+
+
+def _merge(total: Optional[Dict], chunk: Dict) -> Dict:
+    """Combine chunk aggregates (always applied in chunk order)"""
+    if total is None:
+        return chunk
+    return {
+        "position_counts": total["position_counts"] + chunk["position_counts"],
+        "time_counts": total["time_counts"] + chunk["time_counts"],
+        "time_sum": total["time_sum"] + chunk["time_sum"],
+        "time_sq_sum": total["time_sq_sum"] + chunk["time_sq_sum"],
+        "time_min": np.minimum(total["time_min"], chunk["time_min"]),
+        "time_max": np.maximum(total["time_max"], chunk["time_max"]),
+    }
+
+
+def _histogram_quantile(counts: np.ndarray, total: int, q: float, lower: float, upper: float) -> float:
+    """Quantile from a fixed-range histogram, interpolating within the bin"""
+    cumulative = np.cumsum(counts)
+    target = q * total
+    i = int(np.searchsorted(cumulative, target, side="left"))
+    i = min(i, len(counts) - 1)
+    before = cumulative[i - 1] if i > 0 else 0
+    fraction = (target - before) / counts[i] if counts[i] else 0.0
+    width = (upper - lower) / len(counts)
+    return float(lower + (i + fraction) * width)
+
+
+def run_monte_carlo(driver_ids: Optional[List[str]] = None, num_laps: int = 5, runs: int = 10000,
+                    seed: int = 0, workers: Optional[int] = None) -> Dict:
+    """
+    Simulate `runs` races between driver_ids and return per-driver win and
+    podium probability, position histogram and finishing-time statistics.
+    """
+    driver_ids = list(driver_ids or DRIVER_PROFILES.keys())
+    unknown = [d for d in driver_ids if d not in DRIVER_PROFILES]
+    if unknown:
+        raise ValueError(f"Unknown drivers: {', '.join(unknown)}")
+    if not 1 <= runs <= MAX_RUNS:
+        raise ValueError(f"runs must be between 1 and {MAX_RUNS}")
+    if num_laps < 1:
+        raise ValueError("num_laps must be at least 1")
+
+    model = lap_model(driver_ids, num_laps)
+    num_drivers = len(driver_ids)
+    tasks = [
+        (seed, chunk_index, min(CHUNK_RUNS, runs - start), model)
+        for chunk_index, start in enumerate(range(0, runs, CHUNK_RUNS))
+    ]
+
+    workers = min(workers or DEFAULT_WORKERS, len(tasks))
+    total = None
+    if workers <= 1:
+        for task in tasks:
+            total = _merge(total, _run_chunk(task))
+    else:
+        # map() yields in chunk order, so floating-point sums merge identically
+        for chunk in get_pool(workers).map(_run_chunk, tasks):
+            total = _merge(total, chunk)
+
+    position_counts = total["position_counts"]
+    time_counts = total["time_counts"]
+    drivers = {}
+    for d, driver_id in enumerate(driver_ids):
+        mean = total["time_sum"][d] / runs
+        variance = max(0.0, total["time_sq_sum"][d] / runs - mean ** 2)
+        histogram = position_counts[d]
+        drivers[driver_id] = {
+            "name": DRIVER_PROFILES[driver_id]["name"],
+            "win_probability": float(histogram[0] / runs),
+            "podium_probability": float(histogram[:3].sum() / runs),
+            "mean_position": float((np.arange(1, num_drivers + 1) * histogram).sum() / runs),
+            "position_histogram": histogram.tolist(),
+            "finish_time": {
+                "mean": float(mean),
+                "std": float(np.sqrt(variance)),
+                "min": float(total["time_min"][d]),
+                "max": float(total["time_max"][d]),
+                "quantiles": {
+                    f"p{round(q * 100)}": _histogram_quantile(
+                        time_counts[d], runs, q, model["lower"][d], model["upper"][d]
+                    )
+                    for q in QUANTILES
+                },
+            },
+        }
+
+    return {
+        "runs": runs,
+        "num_laps": num_laps,
+        "seed": seed,
+        "chunk_runs": CHUNK_RUNS,
+        "drivers": drivers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a seeded Monte Carlo race ensemble")
+    parser.add_argument("--runs", type=int, default=10000)
+    parser.add_argument("--laps", type=int, default=5)
+    parser.add_argument("--drivers", default=None, help="Comma-separated driver ids (default: full grid)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    drivers = args.drivers.split(",") if args.drivers else None
+    try:
+        result = run_monte_carlo(drivers, args.laps, args.runs, args.seed, args.workers)
+    finally:
+        shutdown_pool()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,9 @@ Implements tire model, vehicle dynamics, and driver AI
 """
 import math
 import random
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from track_index import TrackIndex, get_track_index
 
 
 class Tire:
@@ -58,7 +60,7 @@ class Driver:
         self.tire_management = profile.get("tire_management", 0.7)
         self.consistency = profile.get("consistency", 0.9)
         
-    def get_commands(self, vehicle, track_data: List, target_speed: float) -> Tuple[float, float, float]:
+    def get_commands(self, vehicle, track_data: List, target_speed: float, track: Optional[TrackIndex] = None) -> Tuple[float, float, float]:
         """
         Returns (throttle, brake, steer) commands
         throttle: 0.0 to 1.0
@@ -92,26 +94,19 @@ class Driver:
             brake *= random.uniform(0.9, 1.1)
             
         # Steering (simplified - follow track)
-        steer = self._calculate_steering(vehicle, track_data)
+        steer = self._calculate_steering(vehicle, track_data, track)
         
         return throttle, brake, steer
     
-    def _calculate_steering(self, vehicle, track_data: List) -> float:
+    def _calculate_steering(self, vehicle, track_data: List, track: Optional[TrackIndex] = None) -> float:
         """Calculate steering input to follow track"""
         if not track_data or len(track_data) < 2:
             return 0.0
+        if track is None:
+            track = get_track_index(track_data)
             
-        # Look ahead on track
-        current_idx = vehicle.track_index
-        lookahead_idx = (current_idx + 5) % len(track_data)
-        
-        target_point = track_data[lookahead_idx]
-        current_point = track_data[current_idx]
-        
-        # Calculate desired heading
-        dx = target_point["x"] - current_point["x"]
-        dy = target_point["y"] - current_point["y"]
-        desired_heading = math.atan2(dy, dx)
+        # Desired heading towards the lookahead point on track
+        desired_heading = track.lookahead_headings[vehicle.track_index]
         
         # Steering correction
         heading_error = desired_heading - vehicle.heading
@@ -151,14 +146,16 @@ class Vehicle:
         # Status
         self.status = "Racing"
         
-    def update(self, dt: float, track_data: List):
-        """Main physics update tick"""
+    def update(self, dt: float, track_data: List, track: Optional[TrackIndex] = None):
+        """Main physics update tick (track: shared index of track_data)"""
         if self.status != "Racing" or not track_data:
             return
+        if track is None:
+            track = get_track_index(track_data)
             
         # Get AI commands
-        target_speed = self._get_target_speed(track_data)
-        throttle, brake, steer = self.driver.get_commands(self, track_data, target_speed)
+        target_speed = self._get_target_speed(track_data, track)
+        throttle, brake, steer = self.driver.get_commands(self, track_data, target_speed, track)
         
         # Calculate forces
         engine_force = throttle * self.max_engine_force
@@ -202,75 +199,31 @@ class Vehicle:
         self.distance_on_track += distance_moved
         
         # Get total track length
-        total_track_length = track_data[-1]["distance"]
+        total_track_length = track.total_length
         
         # Lap completion
         if self.distance_on_track >= total_track_length:
             self.distance_on_track -= total_track_length
             self.current_lap += 1
             
-        # Find current track segment (binary search for efficiency)
-        # For now, simple linear search
-        for i in range(len(track_data)):
-            if track_data[i]["distance"] >= self.distance_on_track:
-                self.track_index = i
-                self.pos = [track_data[i]["x"], track_data[i]["y"]]
-                
-                # Update heading from track
-                if i < len(track_data) - 1:
-                    next_point = track_data[i + 1]
-                    dx = next_point["x"] - track_data[i]["x"]
-                    dy = next_point["y"] - track_data[i]["y"]
-                    self.heading = math.atan2(dy, dx)
-                break
+        # Find current track segment, continuing from the previous index
+        i = track.locate(self.distance_on_track, self.track_index)
+        if i >= 0:
+            self.track_index = i
+            self.pos = [track.xs[i], track.ys[i]]
+            
+            # Update heading from track
+            segment_heading = track.segment_headings[i]
+            if segment_heading is not None:
+                self.heading = segment_heading
     
-    def _get_target_speed(self, track_data: List) -> float:
-        """Get target speed for current track section"""
+    def _get_target_speed(self, track_data: List, track: Optional[TrackIndex] = None) -> float:
+        """Get target speed for current track section (precomputed per track point)"""
         if not track_data:
             return 80.0
-            
-        # Look ahead for corners
-        lookahead = 20
-        current_idx = self.track_index
-        
-        # Base speed for straights (F1 cars can reach ~340 km/h = 94 m/s)
-        base_speed = 90.0  # m/s (~324 km/h)
-        
-        # Reduce speed in corners based on curvature
-        if current_idx + lookahead < len(track_data):
-            next_points = track_data[current_idx:min(current_idx + lookahead, len(track_data))]
-            if len(next_points) >= 3:
-                # Calculate curvature approximation
-                p1 = next_points[0]
-                p2 = next_points[len(next_points)//2]
-                p3 = next_points[-1]
-                
-                dx1 = p2["x"] - p1["x"]
-                dy1 = p2["y"] - p1["y"]
-                dx2 = p3["x"] - p2["x"]
-                dy2 = p3["y"] - p2["y"]
-                
-                # Calculate angle change
-                angle1 = math.atan2(dy1, dx1)
-                angle2 = math.atan2(dy2, dx2)
-                angle_change = abs(angle2 - angle1)
-                
-                # Normalize angle
-                if angle_change > math.pi:
-                    angle_change = 2 * math.pi - angle_change
-                    
-                # Reduce speed for corners (more aggressive reduction)
-                # Sharp corners (angle > 0.5 rad) need much slower speeds
-                if angle_change > 0.5:
-                    corner_factor = max(0.3, 1.0 - angle_change * 1.5)
-                elif angle_change > 0.2:
-                    corner_factor = max(0.6, 1.0 - angle_change * 0.8)
-                else:
-                    corner_factor = 1.0
-                    
-                base_speed *= corner_factor
-        
-        return base_speed
+        if track is None:
+            track = get_track_index(track_data)
+        return track.target_speeds[self.track_index]
     
     def get_telemetry(self) -> Dict:
         """Get current telemetry data"""
@@ -0,0 +1,201 @@
+"""
+Batched physics backend for Race Oracle
+Holds vehicle, tire and driver state as NumPy arrays (struct of arrays) and
+advances the whole field in one vectorized step, mirroring Vehicle.update.
+"""
+import math
+import random
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from physics import Vehicle
+from track_index import TrackIndex, get_track_index
+
+
+class BatchedField:
+    """Struct-of-arrays state for every vehicle in a simulation"""
+
+    def __init__(self, vehicles: List[Vehicle], track_data: List[Dict], track: Optional[TrackIndex] = None):
+        self.set_track(track_data, track)
+        self.load(vehicles)
+
+    def set_track(self, track_data: List[Dict], track: Optional[TrackIndex] = None):
+        self.track_data = track_data
+        self.track = track if track is not None else get_track_index(track_data)
+        self.track_x = self.track.x_array
+        self.track_y = self.track.y_array
+        self.track_distance = self.track.distance_array
+
+    def load(self, vehicles: List[Vehicle]):
+        """(Re)load all state from Vehicle objects"""
+        def column(get, dtype=np.float64):
+            return np.array([get(v) for v in vehicles], dtype=dtype)
+
+        self.size = len(vehicles)
+        self.status = [v.status for v in vehicles]
+
+        # Vehicle state
+        self.pos_x = column(lambda v: v.pos[0])
+        self.pos_y = column(lambda v: v.pos[1])
+        self.vel = column(lambda v: v.vel)
+        self.accel = column(lambda v: v.accel)
+        self.heading = column(lambda v: v.heading)
+        self.track_index = column(lambda v: v.track_index, np.int64)
+        self.distance_on_track = column(lambda v: v.distance_on_track)
+        self.current_lap = column(lambda v: v.current_lap, np.int64)
+
+        # Vehicle constants
+        self.mass = column(lambda v: v.mass)
+        self.max_engine_force = column(lambda v: v.max_engine_force)
+        self.max_brake_force = column(lambda v: v.max_brake_force)
+        self.drag_coefficient = column(lambda v: v.drag_coefficient)
+        self.downforce_coefficient = column(lambda v: v.downforce_coefficient)
+
+        # Driver traits
+        self.aggression = column(lambda v: v.driver.aggression)
+        self.tire_management = column(lambda v: v.driver.tire_management)
+        self.consistency = column(lambda v: v.driver.consistency)
+
+        # Tire state
+        self.base_grip = column(lambda v: v.tire.base_grip_multiplier)
+        self.degradation_rate = column(lambda v: v.tire.degradation_rate)
+        self.optimal_temp = column(lambda v: v.tire.optimal_temp)
+        self.tire_temp = column(lambda v: v.tire.current_temp)
+        self.tire_wear = column(lambda v: v.tire.current_wear)
+
+    def store(self, vehicles: List[Vehicle]):
+        """Write the array state back onto Vehicle objects"""
+        for i, v in enumerate(vehicles):
+            v.status = self.status[i]
+            v.pos = [float(self.pos_x[i]), float(self.pos_y[i])]
+            v.vel = float(self.vel[i])
+            v.accel = float(self.accel[i])
+            v.heading = float(self.heading[i])
+            v.track_index = int(self.track_index[i])
+            v.distance_on_track = float(self.distance_on_track[i])
+            v.current_lap = int(self.current_lap[i])
+            v.tire.current_temp = float(self.tire_temp[i])
+            v.tire.current_wear = float(self.tire_wear[i])
+
+    def _steering(self, idx: np.ndarray, heading: np.ndarray) -> np.ndarray:
+        """Vectorized Driver._calculate_steering"""
+        if len(self.track_data) < 2:
+            return np.zeros(idx.shape)
+        heading_error = self.track.lookahead_heading_array[idx] - heading
+        # Normalize to -pi to pi
+        heading_error = np.where(heading_error > math.pi, np.mod(heading_error + math.pi, 2 * math.pi) - math.pi, heading_error)
+        heading_error = np.where(heading_error < -math.pi, np.mod(heading_error + math.pi, 2 * math.pi) - math.pi, heading_error)
+        return np.clip(heading_error * 2.0, -1.0, 1.0)
+
+    def step(self, dt: float):
+        """Advance every racing vehicle by dt (same model as Vehicle.update)"""
+        if not self.track_data:
+            return
+        racing = np.array([status == "Racing" for status in self.status], dtype=bool)
+        active = np.flatnonzero(racing)
+        count = active.size
+        if count == 0:
+            return
+        if count == self.size:
+            # Whole field racing: operate on views instead of gathered copies
+            active = slice(None)
+
+        idx = self.track_index[active]
+        vel = self.vel[active]
+        heading = self.heading[active]
+        mass = self.mass[active]
+        aggression = self.aggression[active]
+
+        # AI commands (Driver.get_commands)
+        target_speed = self.track.target_speed_array[idx]
+        speed_diff = target_speed * (0.95 + aggression * 0.1) - vel
+        throttle = np.where(speed_diff > 5, np.minimum(1.0, speed_diff / 50.0), np.where(speed_diff < -5, 0.0, 0.3))
+        brake = np.where(
+            speed_diff < -5,
+            np.minimum(1.0, np.abs(speed_diff) / 80.0 * (1.2 - aggression * 0.2)),
+            0.0,
+        )
+        smoothing = self.tire_management[active]
+        throttle = throttle * (0.7 + smoothing * 0.3)
+        brake = brake * (0.7 + smoothing * 0.3)
+
+        # Consistency variation: same draws, in the same order, as the object path
+        throttle_jitter = np.ones(count)
+        brake_jitter = np.ones(count)
+        consistency = self.consistency[active]
+        for k in range(count):
+            if random.random() > consistency[k]:
+                throttle_jitter[k] = random.uniform(0.9, 1.1)
+                brake_jitter[k] = random.uniform(0.9, 1.1)
+        throttle = throttle * throttle_jitter
+        brake = brake * brake_jitter
+
+        steer = self._steering(idx, heading)
+
+        # Calculate forces
+        engine_force = throttle * self.max_engine_force[active]
+        brake_force = brake * self.max_brake_force[active]
+        drag_force = 0.5 * self.drag_coefficient[active] * (vel ** 2)
+        net_force = engine_force - brake_force - drag_force
+        accel = net_force / mass
+        vel = np.maximum(0.0, vel + accel * dt)
+
+        # Grip budget (Tire.get_current_grip, mechanical + aero)
+        wear = self.tire_wear[active]
+        temp = self.tire_temp[active]
+        optimal_temp = self.optimal_temp[active]
+        wear_factor = 1.0 - (wear * 0.4)
+        temp_factor = np.maximum(0.7, 1.0 - (np.abs(temp - optimal_temp) / 50.0))
+        grip = self.base_grip[active] * wear_factor * temp_factor
+        mechanical_grip = grip * 9.81 * mass
+        aero_downforce = self.downforce_coefficient[active] * (vel ** 2)
+        grip_budget = mechanical_grip + aero_downforce
+
+        # Lateral force for cornering
+        lateral_force_requested = np.abs(steer) * vel * 500.0
+        lateral_force = np.minimum(lateral_force_requested, grip_budget * 0.7)
+
+        # Sliding detection
+        sliding = lateral_force_requested > grip_budget * 0.7
+        sliding_factor = np.where(sliding, (lateral_force_requested - grip_budget * 0.7) / grip_budget, 0.0)
+        vel = np.where(sliding, vel * 0.98, vel)
+
+        # Update tire (Tire.update_wear / update_temperature)
+        distance_km = vel * dt / 1000.0
+        wear = np.minimum(1.0, wear + distance_km * self.degradation_rate[active] * 0.001 + sliding_factor * 0.002)
+        target_temp = optimal_temp + (vel * 0.1) + ((lateral_force / 1000.0) * 5.0)
+        temp = temp + (target_temp - temp) * 0.05
+
+        # Update heading
+        moving = vel > 1.0
+        safe_vel = np.where(moving, vel, 1.0)
+        turn_rate = steer * 0.5 * (lateral_force / (mass * safe_vel))
+        heading = np.where(moving, heading + turn_rate * dt, heading)
+
+        # Update position along track and lap completion
+        total_track_length = self.track_distance[-1]
+        distance = self.distance_on_track[active] + vel * dt
+        lapped = distance >= total_track_length
+        distance = np.where(lapped, distance - total_track_length, distance)
+        self.current_lap[active] += lapped
+
+        # Find current track segment: first point at or beyond the distance
+        n = len(self.track_data)
+        segment = np.searchsorted(self.track_distance, distance, side="left")
+        found = segment < n
+        new_idx = np.where(found, segment, idx)
+        self.pos_x[active] = np.where(found, self.track_x[np.minimum(segment, n - 1)], self.pos_x[active])
+        self.pos_y[active] = np.where(found, self.track_y[np.minimum(segment, n - 1)], self.pos_y[active])
+
+        # Update heading from track
+        has_next = found & (segment < n - 1)
+        heading = np.where(has_next, self.track.heading_array[np.minimum(segment, n - 1)], heading)
+
+        self.track_index[active] = new_idx
+        self.vel[active] = vel
+        self.accel[active] = accel
+        self.heading[active] = heading
+        self.distance_on_track[active] = distance
+        self.tire_wear[active] = wear
+        self.tire_temp[active] = temp
@@ -0,0 +1,208 @@
+"""
+Opt-in tick profiler for Race Oracle
+While enabled, a background thread samples the stack of every thread that is
+inside a tick (a broadcast tick or a Simulation.update) every INTERVAL_MS.
+Samples of ticks that run longer than the threshold are kept, labelled with
+the phase they fell in (snapshot, encode, send, physics, ai), and exported as
+collapsed stacks for flamegraph tools; samples of fast ticks are discarded.
+
+A tick that awaits marks the await with waiting(): the time is reported as
+the "wait" phase and does not count towards the threshold, and samples taken
+meanwhile (other coroutines on the loop) are labelled "wait", or "send" when
+they are inside a WebSocket send.
+
+Enable with RACE_ORACLE_PROFILE=1 or POST /admin/profiler?enabled=true.
+When disabled, tick() and phase() return a shared no-op context, and hot
+loops check PROFILER.enabled before entering one.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ENABLED = os.environ.get("RACE_ORACLE_PROFILE", "0") == "1"
+THRESHOLD_MS = float(os.environ.get("RACE_ORACLE_PROFILE_THRESHOLD_MS", "50"))
+INTERVAL_MS = float(os.environ.get("RACE_ORACLE_PROFILE_INTERVAL_MS", "1"))
+
+# Slow-tick summaries kept for /admin/profiler
+MAX_SLOW_TICKS = 100
+
+# Samples whose stack passes through these functions count as the given phase
+PHASE_FUNCTIONS = {
+    "get_commands": "ai",
+    "_calculate_steering": "ai",
+    "_get_target_speed": "ai",
+    "_steering": "ai",
+    "_send_payload": "send",
+}
+
+WAIT_PHASE = "wait"
+
+_NULL_CONTEXT = nullcontext()
+
+
+class _Tick:
+    """A tick in progress on one thread"""
+
+    def __init__(self, name: str, phase: Optional[str]):
+        self.name = name
+        self.started = self.marked = time.perf_counter()
+        self.phases: List[str] = [phase or name]
+        self.phase_seconds: Dict[str, float] = {}
+        self.samples: List[str] = []
+
+    def charge(self):
+        """Add the time since the last phase change to the innermost phase (phase times are exclusive)"""
+        now = time.perf_counter()
+        phase = self.phases[-1]
+        self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + now - self.marked
+        self.marked = now
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{Path(code.co_filename).stem}:{code.co_name}"
+
+
+class TickProfiler:
+    """Samples stacks during ticks and keeps those of ticks over the threshold"""
+
+    def __init__(self, enabled: bool = ENABLED, threshold_ms: float = THRESHOLD_MS, interval_ms: float = INTERVAL_MS):
+        self.enabled = False
+        self.threshold_ms = threshold_ms
+        self.interval_ms = interval_ms
+        self._ticks: Dict[int, _Tick] = {}
+        self._lock = threading.Lock()
+        self._sampler: Optional[threading.Thread] = None
+        self.stacks: Counter = Counter()
+        self.slow_ticks: deque = deque(maxlen=MAX_SLOW_TICKS)
+        self.ticks_seen = 0
+        if enabled:
+            self.enable()
+
+    def enable(self, threshold_ms: Optional[float] = None):
+        if threshold_ms is not None:
+            self.threshold_ms = threshold_ms
+        self.enabled = True
+        if self._sampler is None or not self._sampler.is_alive():
+            self._sampler = threading.Thread(target=self._sample_loop, name="race-oracle-profiler", daemon=True)
+            self._sampler.start()
+
+    def disable(self):
+        """Stop sampling (the sampler thread exits on its next wake-up)"""
+        self.enabled = False
+        self._ticks.clear()
+
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+            self.slow_ticks.clear()
+            self.ticks_seen = 0
+
+    def tick(self, name: str, phase: Optional[str] = None):
+        """Context for one tick; nested ticks on the same thread belong to the outer one"""
+        if not self.enabled or threading.get_ident() in self._ticks:
+            return _NULL_CONTEXT
+        return self._tick(name, phase)
+
+    def phase(self, name: str):
+        """Context labelling the samples (and time) of part of the current tick"""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        tick = self._ticks.get(threading.get_ident())
+        if tick is None:
+            return _NULL_CONTEXT
+        return self._phase(tick, name)
+
+    def waiting(self):
+        """Context around an await inside the current tick (see the module docstring)"""
+        return self.phase(WAIT_PHASE)
+
+    @contextmanager
+    def _tick(self, name: str, phase: Optional[str]):
+        thread_id = threading.get_ident()
+        tick = _Tick(name, phase)
+        self._ticks[thread_id] = tick
+        try:
+            yield
+        finally:
+            self._ticks.pop(thread_id, None)
+            tick.charge()
+            self._finish(tick, time.perf_counter() - tick.started)
+
+    @contextmanager
+    def _phase(self, tick: _Tick, name: str):
+        tick.charge()
+        tick.phases.append(name)
+        try:
+            yield
+        finally:
+            tick.charge()
+            tick.phases.pop()
+
+    def _finish(self, tick: _Tick, duration: float):
+        # Time spent awaiting is not the tick's own work
+        busy = duration - tick.phase_seconds.get(WAIT_PHASE, 0.0)
+        with self._lock:
+            self.ticks_seen += 1
+            if busy * 1000 < self.threshold_ms:
+                return
+            phase_samples = Counter(sample.split(";", 2)[1] for sample in tick.samples)
+            self.stacks.update(tick.samples)
+            self.slow_ticks.append({
+                "tick": tick.name,
+                "at": time.time(),
+                "duration_ms": round(duration * 1000, 3),
+                "busy_ms": round(busy * 1000, 3),
+                "phase_ms": {name: round(seconds * 1000, 3) for name, seconds in tick.phase_seconds.items()},
+                "phase_samples": dict(phase_samples),
+            })
+
+    def _sample_loop(self):
+        while self.enabled:
+            time.sleep(self.interval_ms / 1000)
+            if not self._ticks:
+                continue
+            frames = sys._current_frames()
+            for thread_id, tick in list(self._ticks.items()):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    tick.samples.append(self._collapse(tick, frame))
+
+    @staticmethod
+    def _collapse(tick: _Tick, frame) -> str:
+        """tick;phase;outermost frame;...;innermost frame"""
+        labels = []
+        phase = tick.phases[-1]
+        while frame is not None:
+            phase = PHASE_FUNCTIONS.get(frame.f_code.co_name, phase)
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        labels.reverse()
+        return ";".join([tick.name, phase, *labels])
+
+    def collapsed(self) -> str:
+        """Collapsed-stack lines ("frame;frame;... count") for flamegraph.pl or speedscope"""
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def dump(self, path):
+        Path(path).write_text(self.collapsed())
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "threshold_ms": self.threshold_ms,
+                "interval_ms": self.interval_ms,
+                "ticks_seen": self.ticks_seen,
+                "slow_ticks": len(self.slow_ticks),
+                "recent": list(self.slow_ticks)[-10:],
+            }
+
+
+PROFILER = TickProfiler()
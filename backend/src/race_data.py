@@ -5,6 +5,13 @@ Synchronized 2025 F1 Grid Drivers and Scenarios to match the frontend.
 import random
 import math
 
+import numpy as np
+
+from scenario_cache import SCENARIO_CACHE, cache_key
+from scenario_registry import ScenarioRegistry
+from scenario_store import ColumnarRaceData, DriverTelemetry, STATUS_INDEX
+from track_catalog import TRACK_CATALOG
+
 # Synchronized 2025 F1 Grid - 20 Driver Profiles
 DRIVER_PROFILES = {
     "VER": {"name": "Max Verstappen",    "short_name": "M. Verstappen", "number": 1,  "team": "Red Bull Racing", "color": "#3671C6", "aggression": 0.95, "tire_management": 0.78, "consistency": 0.98, "base_lap_time": 79.2},
@@ -103,13 +110,26 @@ SCENARIOS_TEMPLATES = [
     },
 ]
 
-MONZA_TRACK_LENGTH = 57612.996821870605
+# Catalog id of the circuit the curated scenarios run on (a template may name its own)
+DEFAULT_TRACK_ID = "monza"
+
+# Bump when the generator's output changes so cached scenarios are rebuilt
+GENERATOR_VERSION = 1
 
-def generate_race_telemetry(scenario, track_length=57612.996821870605):
+def generate_race_telemetry(scenario, track_length=None, vectorized=True):
     """
     Generate deterministic race telemetry for the selected scenario's drivers.
     Returns telemetry dictionary mapping driver_id -> list of time points.
+    The vectorized mode computes every sample with NumPy and returns the same
+    points as the reference per-second loop (vectorized=False).
+    track_length defaults to the length of the scenario's track.
     """
+    if track_length is None:
+        track_length = scenario["track_length"]
+    if vectorized:
+        arrays = generate_race_arrays(scenario, track_length)
+        return {driver_id: _arrays_to_telemetry(columns) for driver_id, columns in arrays.items()}
+
     num_laps = scenario["num_laps"]
     drivers = scenario["drivers"]
     aggression_factor = scenario["aggression_factor"]
@@ -194,32 +214,196 @@ def generate_race_telemetry(scenario, track_length=57612.996821870605):
         
     return race_data
 
+def generate_race_arrays(scenario, track_length=None):
+    """
+    Vectorized telemetry generation.
+    Evaluates every timestep of every driver in a single NumPy pass and returns
+    driver_id -> dict of column arrays (one entry per 1 second sample).
+    """
+    if track_length is None:
+        track_length = scenario["track_length"]
+    num_laps = scenario["num_laps"]
+    drivers = scenario["drivers"]
+    aggression_factor = scenario["aggression_factor"]
+    pace_factor = scenario["pace_factor"]
+    grid_spacing = 350.0
+    wear_rate = 10.5
+    total_race_dist = num_laps * track_length
+
+    profiles = [DRIVER_PROFILES[driver_id] for driver_id in drivers]
+    idx = np.arange(len(drivers), dtype=np.float64)[:, None]
+    base_lap = np.array([p["base_lap_time"] for p in profiles])[:, None]
+    aggression = np.array([p["aggression"] for p in profiles])[:, None]
+    consistency = np.array([p["consistency"] for p in profiles])[:, None]
+    tire_management = np.array([p["tire_management"] for p in profiles])[:, None]
+
+    # Per-driver constants (same operation order as the scalar loop)
+    aggr_mod = 1.0 - (aggression - 0.82) * 0.045 * aggression_factor
+    lap_time = base_lap * pace_factor * aggr_mod
+    mgmt_factor = 1.15 - tire_management * 0.45
+    effective_lap = lap_time * (1.0 + (wear_rate * mgmt_factor * num_laps * 0.5) * 0.002)
+    finish_time = ((total_race_dist + idx * grid_spacing) / track_length) * effective_lap
+    seed = base_lap * 1000 + aggression * 100 + scenario["scenario_id"] * 7
+
+    # 1 second samples up to a small buffer past each driver's crossing
+    num_samples = [int(math.floor(f + 5.0)) + 1 for f in finish_time[:, 0]]
+    t = np.arange(max(num_samples, default=0), dtype=np.float64)[None, :]
+
+    tire_wear = np.minimum(98.0, (t / lap_time) * wear_rate * mgmt_factor * 0.05)
+    tire_penalty = 1.0 + (tire_wear * 0.5) * 0.002
+
+    pv1 = np.sin(t * 0.052 + seed) * 0.008
+    pv2 = np.sin(t * 0.021 + seed * 1.7) * 0.005
+    cv = np.sin(t * 0.11 + consistency * 10 + idx) * (1.0 - consistency) * 0.015
+    total_pace_var = 1.0 + (pv1 + pv2 + cv) * aggression_factor
+
+    current_effective_lap = lap_time * tire_penalty * total_pace_var
+    race_distance = (t / current_effective_lap) * track_length - idx * grid_spacing
+
+    is_finished = t >= finish_time
+    completed_distance = np.where(is_finished, total_race_dist, np.maximum(0.0, race_distance))
+    lap = np.where(
+        is_finished,
+        num_laps,
+        np.minimum(num_laps, (completed_distance / track_length).astype(np.int64) + 1),
+    )
+    track_position = np.where(is_finished, 0.0, np.mod(completed_distance, track_length))
+
+    progress = track_position / track_length
+    corner_dips = (
+        np.exp(-((progress - 0.08)**2) / 0.001) * 160 +
+        np.exp(-((progress - 0.24)**2) / 0.002) * 120 +
+        np.exp(-((progress - 0.47)**2) / 0.003) * 135 +
+        np.exp(-((progress - 0.70)**2) / 0.001) * 110 +
+        np.exp(-((progress - 0.88)**2) / 0.002) * 150
+    )
+    speed = np.maximum(82.0, 318.0 - corner_dips) * (1.0 - tire_wear * 0.003)
+    speed_kph = np.where(is_finished, 0.0, speed)
+    tire_temp = np.where(is_finished, 70.0, 78.0 + speed * 0.075 + tire_wear * 0.42)
+
+    race_data = {}
+    for row, driver_id in enumerate(drivers):
+        n = num_samples[row]
+        race_data[driver_id] = {
+            "time": t[0, :n],
+            "lap": lap[row, :n],
+            "distance": completed_distance[row, :n],
+            "track_position": track_position[row, :n],
+            "speed": speed_kph[row, :n],
+            "tire_wear": tire_wear[row, :n],
+            "tire_temp": tire_temp[row, :n],
+            "finished": is_finished[row, :n],
+            "finish_time": float(finish_time[row, 0]),
+        }
+    return race_data
+
+def _arrays_to_telemetry(columns):
+    """Convert one driver's column arrays into the list-of-points format"""
+    finish_time = columns["finish_time"]
+    return [
+        {
+            "time": t,
+            "lap": lap,
+            "distance": distance,
+            "track_position": track_position,
+            "speed": round(speed, 1),
+            "tire_wear": round(tire_wear, 1),
+            "tire_temp": round(tire_temp, 1),
+            "status": "Finished" if finished else "Racing",
+            "finish_time": finish_time,
+        }
+        for t, lap, distance, track_position, speed, tire_wear, tire_temp, finished in zip(
+            columns["time"].tolist(),
+            columns["lap"].tolist(),
+            columns["distance"].tolist(),
+            columns["track_position"].tolist(),
+            columns["speed"].tolist(),
+            columns["tire_wear"].tolist(),
+            columns["tire_temp"].tolist(),
+            columns["finished"].tolist(),
+        )
+    ]
+
+def generate_race_columns(scenario, track_length=None):
+    """
+    Generate the scenario's telemetry straight into the compact columnar store.
+    Points read back through the adapter match generate_race_telemetry.
+    """
+    race_data = {}
+    for driver_id, columns in generate_race_arrays(scenario, track_length).items():
+        status = np.where(columns["finished"], STATUS_INDEX["Finished"], STATUS_INDEX["Racing"])
+        race_data[driver_id] = DriverTelemetry(
+            {
+                "time": columns["time"],
+                "lap": columns["lap"],
+                "distance": columns["distance"],
+                "track_position": columns["track_position"],
+                "speed": np.round(columns["speed"], 1),
+                "tire_wear": np.round(columns["tire_wear"], 1),
+                "tire_temp": np.round(columns["tire_temp"], 1),
+                "status": status,
+            },
+            constants={"finish_time": columns["finish_time"]},
+        )
+    return ColumnarRaceData(race_data)
+
+def scenario_metadata(template):
+    """Scenario fields available without generating telemetry"""
+    track = TRACK_CATALOG.get(template.get("track_id", DEFAULT_TRACK_ID))
+    return {
+        "scenario_id": template["scenario_id"],
+        "name": template["name"],
+        "description": template["description"],
+        "num_drivers": template["num_drivers"],
+        "num_laps": template["num_laps"],
+        "aggression_factor": template["aggression_factor"],
+        "pace_factor": template["pace_factor"],
+        "drivers": template["drivers"],
+        "track_id": track.id,
+        "track_length": track.length,
+    }
+
 def build_all_scenarios():
     """Construct all 7 scenarios with full high-fidelity simulated telemetry"""
     scenarios = []
     for template in SCENARIOS_TEMPLATES:
-        sc = {
-            "scenario_id": template["scenario_id"],
-            "name": template["name"],
-            "description": template["description"],
-            "num_drivers": template["num_drivers"],
-            "num_laps": template["num_laps"],
-            "aggression_factor": template["aggression_factor"],
-            "pace_factor": template["pace_factor"],
-            "drivers": template["drivers"],
-            "track_length": MONZA_TRACK_LENGTH,
-        }
+        sc = scenario_metadata(template)
         # Simulate telemetry
-        telemetry, drivers = template["drivers"], template["drivers"]
-        sc["race_data"] = generate_race_telemetry(sc, MONZA_TRACK_LENGTH)
+        sc["race_data"] = generate_race_columns(sc)
         scenarios.append(sc)
     return scenarios
 
-# Generate high-fidelity telemetry on module load
-RACE_SCENARIOS = build_all_scenarios()
+def scenario_cache_key(meta):
+    """On-disk cache key: generator version plus every parameter the telemetry depends on"""
+    params = {
+        "scenario_id": meta["scenario_id"],
+        "num_laps": meta["num_laps"],
+        "drivers": meta["drivers"],
+        "aggression_factor": meta["aggression_factor"],
+        "pace_factor": meta["pace_factor"],
+        "track_length": meta["track_length"],
+        "profiles": [DRIVER_PROFILES[driver_id] for driver_id in meta["drivers"]],
+    }
+    return cache_key("race_data", GENERATOR_VERSION, params)
 
-def get_race_snapshot(scenario, time_seconds):
-    """Get synchronized race standings at a specific timestamp"""
+def _build_scenario(meta):
+    """Load a scenario's telemetry from the disk cache, generating it on a miss"""
+    return SCENARIO_CACHE.get_or_build(
+        scenario_cache_key(meta),
+        lambda: generate_race_columns(meta, meta["track_length"]),
+    )
+
+# Scenario metadata is registered on module load; telemetry is generated on first use
+RACE_SCENARIOS = ScenarioRegistry(
+    [scenario_metadata(template) for template in SCENARIOS_TEMPLATES],
+    build=_build_scenario,
+)
+
+def get_race_snapshot(scenario, time_seconds, interpolate=False):
+    """
+    Get synchronized race standings at a specific timestamp.
+    With interpolate=True, speed and positions are blended between 1 s samples.
+    """
     snapshot = {
         "time": time_seconds,
         "vehicles": []
@@ -231,13 +415,8 @@ def get_race_snapshot(scenario, time_seconds):
     for driver_id in drivers:
         telemetry = race_data[driver_id]
         
-        # Binary search or linear search for closest time stamp
-        closest_point = telemetry[0]
-        for point in telemetry:
-            if point["time"] <= time_seconds:
-                closest_point = point
-            else:
-                break
+        # Last sample at or before the requested time (first sample before the start)
+        closest_point = telemetry.sample_at(time_seconds, interpolate, scenario["track_length"]) or telemetry[0]
                 
         profile = DRIVER_PROFILES[driver_id]
         snapshot["vehicles"].append({
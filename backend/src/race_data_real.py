@@ -2,11 +2,18 @@
 Monte Carlo race simulation using REAL F1 track data from FastF1
 Combines real track coordinates with simulated race scenarios
 """
-import json
+import os
 import random
 import math
 from pathlib import Path
 
+import numpy as np
+
+from scenario_cache import SCENARIO_CACHE, cache_key, file_fingerprint
+from scenario_registry import ScenarioRegistry
+from scenario_store import ColumnarRaceData, DriverTelemetry
+from track_catalog import TRACK_CATALOG, track_id_for
+
 # Driver profiles (same as before)
 DRIVER_PROFILES = {
     "VER": {
@@ -47,22 +54,44 @@ DRIVER_PROFILES = {
 }
 
 
-def load_real_track_data(track_file='monza_track_real.json'):
-    """Load real track data from FastF1"""
-    track_path = Path('../public/tracks') / track_file
-    
-    if not track_path.exists():
-        # Fallback to original track
-        track_path = Path('../public/tracks/monza_track.json')
-    
-    with open(track_path, 'r') as f:
-        return json.load(f)
+# Bump when the generator's output changes so cached scenarios are rebuilt
+GENERATOR_VERSION = 1
+
+# Base seed for scenario parameters and per-scenario RNG streams
+DEFAULT_SEED = int(os.environ.get("RACE_ORACLE_SEED", "2024"))
+
+
+# Catalog ids of the FastF1 tracks scenarios are spread over (default: every track with speed data)
+REAL_TRACK_IDS = [t for t in os.environ.get("RACE_ORACLE_REAL_TRACKS", "").split(",") if t]
+
+
+def real_track_ids():
+    """Tracks to generate scenarios on, falling back to the original track"""
+    if REAL_TRACK_IDS:
+        return REAL_TRACK_IDS
+    track_ids = [track.id for track in TRACK_CATALOG.tracks() if track.meta["has_speed"]]
+    return track_ids or ["monza"]
 
 
-def generate_race_with_real_track(track_data, num_laps=5, num_drivers=5):
+def load_real_track_data(track_id='monza_real', track_file=None):
     """
-    Generate Monte Carlo race simulation using REAL track coordinates
+    Load real track data from FastF1.
+    Takes a catalog id; a track file name (the old argument, e.g.
+    'monza_track_real.json') is also accepted, positionally or as track_file.
     """
+    if track_file is None and track_id.endswith('.json'):
+        track_file = track_id
+    if track_file is not None:
+        track_id = track_id_for(Path(track_file))
+    return TRACK_CATALOG.get(track_id).load()
+
+
+def generate_race_with_real_track(track_data, num_laps=5, num_drivers=5, seed=None):
+    """
+    Generate Monte Carlo race simulation using REAL track coordinates.
+    A seed gives the race its own RNG stream; without one the global random is used.
+    """
+    rng = random.Random(seed) if seed is not None else random
     drivers = list(DRIVER_PROFILES.keys())[:num_drivers]
     track_length = track_data['total_length']
     track_points = track_data['points']
@@ -76,6 +105,9 @@ def generate_race_with_real_track(track_data, num_laps=5, num_drivers=5):
         "SAI": 83.8,
     }
     
+    # Track coordinates are stored once and referenced by index from every sample
+    track_xy = np.array([[p['x'], p['y']] for p in track_points], dtype=np.float64)
+    
     race_data = {}
     
     for driver_id in drivers:
@@ -88,13 +120,13 @@ def generate_race_with_real_track(track_data, num_laps=5, num_drivers=5):
         elif profile["aggression"] < 0.8:
             base_time *= 1.02
         
-        telemetry = []
+        columns = {name: [] for name in ("time", "lap", "distance", "track_position", "speed", "tire_wear", "tire_temp", "track_point")}
         current_time = 0
         
         for lap in range(1, num_laps + 1):
             # Lap time with consistency variation
             consistency_var = (1.0 - profile["consistency"]) * 2.0
-            lap_time = base_time * (1.0 + random.uniform(-consistency_var, consistency_var))
+            lap_time = base_time * (1.0 + rng.uniform(-consistency_var, consistency_var))
             
             # Tire degradation
             tire_wear = (lap - 1) * (1.0 - profile["tire_management"]) * 0.15
@@ -116,66 +148,81 @@ def generate_race_with_real_track(track_data, num_laps=5, num_drivers=5):
                 speed *= (1.0 - tire_wear * 0.5)
                 
                 # Add consistency variation
-                if random.random() > profile["consistency"]:
-                    speed *= random.uniform(0.95, 1.05)
+                if rng.random() > profile["consistency"]:
+                    speed *= rng.uniform(0.95, 1.05)
                 
                 # Calculate distance along track
                 track_position = track_point['distance']
                 total_distance = (lap - 1) * track_length + track_position
                 
-                telemetry.append({
-                    "time": current_time,
-                    "lap": lap,
-                    "distance": total_distance,
-                    "track_position": track_position,
-                    "speed": round(speed, 1),
-                    "tire_wear": round(tire_wear * 100, 1),
-                    "tire_temp": round(80 + speed * 0.1 + random.uniform(-5, 5), 1),
-                    "x": track_point['x'],
-                    "y": track_point['y'],
-                })
+                columns["time"].append(current_time)
+                columns["lap"].append(lap)
+                columns["distance"].append(total_distance)
+                columns["track_position"].append(track_position)
+                columns["speed"].append(round(speed, 1))
+                columns["tire_wear"].append(round(tire_wear * 100, 1))
+                columns["tire_temp"].append(round(80 + speed * 0.1 + rng.uniform(-5, 5), 1))
+                columns["track_point"].append(point_idx)
                 
                 current_time += time_per_point
         
-        race_data[driver_id] = telemetry
+        race_data[driver_id] = DriverTelemetry(columns, track_xy=track_xy)
+    
+    race_data = ColumnarRaceData(race_data)
     
     return race_data, drivers
 
 
-def generate_multiple_scenarios_real(num_scenarios=10):
-    """Generate multiple race scenarios using REAL track data"""
-    
-    # Load real track
-    track_data = load_real_track_data()
-    
+def scenario_metadata_real(track_ids, num_scenarios=10, seed=DEFAULT_SEED):
+    """
+    Draw scenario parameters (and a per-scenario seed) without generating
+    telemetry. Scenarios take the tracks in turn.
+    """
+    rng = random.Random(seed)
     scenarios = []
     
     for scenario_idx in range(num_scenarios):
-        num_drivers = random.randint(3, 5)
-        num_laps = random.randint(3, 8)
-        
-        race_data, drivers = generate_race_with_real_track(
-            track_data=track_data,
-            num_laps=num_laps,
-            num_drivers=num_drivers
-        )
+        track = TRACK_CATALOG.get(track_ids[scenario_idx % len(track_ids)])
+        num_drivers = rng.randint(3, 5)
+        num_laps = rng.randint(3, 8)
         
         scenarios.append({
             "scenario_id": scenario_idx,
             "num_drivers": num_drivers,
             "num_laps": num_laps,
-            "aggression_factor": random.uniform(0.8, 1.2),
-            "drivers": drivers,
-            "race_data": race_data,
-            "track_length": track_data['total_length'],
-            "track_name": track_data['track_name'],
+            "aggression_factor": rng.uniform(0.8, 1.2),
+            "drivers": list(DRIVER_PROFILES.keys())[:num_drivers],
+            "track_id": track.id,
+            "track_length": track.length,
+            "track_name": track.name,
+            "seed": rng.getrandbits(32),
         })
     
     return scenarios
 
 
-def get_race_snapshot(scenario, time_seconds):
-    """Get race state at specific time"""
+def generate_multiple_scenarios_real(num_scenarios=10, seed=DEFAULT_SEED):
+    """Generate multiple race scenarios using REAL track data"""
+    scenarios = scenario_metadata_real(real_track_ids(), num_scenarios, seed)
+    
+    for scenario in scenarios:
+        scenario["race_data"], _ = generate_race_with_real_track(
+            track_data=TRACK_CATALOG.get(scenario["track_id"]).load(),
+            num_laps=scenario["num_laps"],
+            num_drivers=scenario["num_drivers"],
+            seed=scenario["seed"]
+        )
+    
+    return scenarios
+
+
+def _sector_type(sectors, track_position):
+    sector = sectors.sector_at(track_position)
+    return sector["type"] if sector else None
+
+
+def get_race_snapshot(scenario, time_seconds, interpolate=False):
+    """Get race state at specific time, optionally interpolated between samples"""
     snapshot = {
         "time": time_seconds,
         "vehicles": []
@@ -183,17 +230,13 @@ def get_race_snapshot(scenario, time_seconds):
     
     race_data = scenario["race_data"]
     drivers = scenario["drivers"]
+    sectors = TRACK_CATALOG.get(scenario["track_id"]).sectors
     
     for driver_id in drivers:
         telemetry = race_data[driver_id]
         
-        # Find closest telemetry point
-        closest_point = None
-        for point in telemetry:
-            if point["time"] <= time_seconds:
-                closest_point = point
-            else:
-                break
+        # Find closest telemetry point (none before the driver's first sample)
+        closest_point = telemetry.sample_at(time_seconds, interpolate, scenario["track_length"])
         
         if closest_point:
             profile = DRIVER_PROFILES[driver_id]
@@ -207,16 +250,34 @@ def get_race_snapshot(scenario, time_seconds):
                 "tire_wear": closest_point["tire_wear"],
                 "tire_temp": closest_point["tire_temp"],
                 "distance": closest_point["distance"],
+                "sector": _sector_type(sectors, closest_point["track_position"]),
                 "aggression": profile["aggression"],
             })
     
     return snapshot
 
 
-# Generate scenarios on module load
-print("Loading REAL track data and generating Monte Carlo scenarios...")
-RACE_SCENARIOS = generate_multiple_scenarios_real(num_scenarios=15)
-print(f"✓ Generated {len(RACE_SCENARIOS)} scenarios using REAL F1 track data")
+def scenario_cache_key(meta):
+    """On-disk cache key: track file contents, generator version and seed"""
+    params = {"num_laps": meta["num_laps"], "num_drivers": meta["num_drivers"], "seed": meta["seed"]}
+    track_hash = file_fingerprint(TRACK_CATALOG.get(meta["track_id"]).path)
+    return cache_key("race_data_real", GENERATOR_VERSION, params, track_hash)
+
+
+def _build_scenario(meta):
+    """Load a scenario's telemetry from the disk cache, generating it on a miss"""
+    track = TRACK_CATALOG.get(meta["track_id"])
+    return SCENARIO_CACHE.get_or_build(
+        scenario_cache_key(meta),
+        lambda: generate_race_with_real_track(track.load(), meta["num_laps"], meta["num_drivers"], meta["seed"])[0],
+        track_xy=track.xy,
+    )
+
+
+# Register scenarios on module load; telemetry is generated when first requested
+print("Loading REAL track data and registering Monte Carlo scenarios...")
+RACE_SCENARIOS = ScenarioRegistry(scenario_metadata_real(real_track_ids(), num_scenarios=15), build=_build_scenario)
+print(f"✓ Registered {len(RACE_SCENARIOS)} scenarios using REAL F1 track data")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+"""
+Response cache for the Race Oracle REST endpoints
+Payloads are JSON-encoded and compressed once, served with ETags, and rebuilt
+only when a file they were built from changes.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional: gzip is always available
+    brotli = None
+
+# Payloads smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+Signature = Tuple[Tuple[str, int, int], ...]
+
+
+class CachedResponse:
+    """One pre-encoded payload with its compressed variants and ETag"""
+
+    def __init__(self, body: bytes, signature: Signature, media_type: str = "application/json"):
+        self.body = body
+        self.signature = signature
+        self.media_type = media_type
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.variants: Dict[str, bytes] = {}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            self.variants["gzip"] = gzip.compress(body, compresslevel=6, mtime=0)
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=5)
+
+    @classmethod
+    def from_payload(cls, payload, signature: Signature, media_type: str = "application/json") -> "CachedResponse":
+        """JSON-encode payload (bytes payloads are used as the body as-is)"""
+        if isinstance(payload, bytes):
+            return cls(payload, signature, media_type)
+        body = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+        return cls(body, signature, media_type)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.body) + sum(len(v) for v in self.variants.values())
+
+
+def file_signature(paths: Iterable[Path]) -> Signature:
+    """(path, mtime_ns, size) of each existing path; changes when any file changes"""
+    signature = []
+    for path in paths:
+        try:
+            stat = Path(path).stat()
+        except OSError:
+            continue
+        signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(signature))
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in ("*", etag):
+            return True
+    return False
+
+
+def _preferred_encoding(accept_encoding: str, variants: Dict[str, bytes]) -> Optional[str]:
+    accepted = {token.split(";")[0].strip().lower() for token in accept_encoding.split(",")}
+    for encoding in ("br", "gzip"):
+        if encoding in accepted and encoding in variants:
+            return encoding
+    return None
+
+
+class ResponseCache:
+    """LRU of CachedResponse entries keyed by endpoint + arguments"""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, build: Callable[[], object], depends_on: Callable[[], Iterable[Path]] = lambda: (),
+            media_type: str = "application/json") -> CachedResponse:
+        """
+        Cached entry for key, rebuilt when the signature of the files returned
+        by depends_on() differs from the one it was built against.
+        """
+        signature = file_signature(depends_on())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = CachedResponse.from_payload(build(), signature, media_type)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+def cached_response(request: Request, entry: CachedResponse, vary: str = "Accept-Encoding") -> Response:
+    """304 if the client's ETag matches, otherwise the best encoded variant"""
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": "no-cache",
+        "Vary": vary,
+    }
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding = _preferred_encoding(request.headers.get("accept-encoding", ""), entry.variants)
+    if encoding is None:
+        return Response(entry.body, media_type=entry.media_type, headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(entry.variants[encoding], media_type=entry.media_type, headers=headers)
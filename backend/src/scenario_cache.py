@@ -0,0 +1,183 @@
+"""
+Persistent scenario cache for Race Oracle
+Stores generated telemetry columns on disk as .npy files and memory-maps them
+on load, so restarts are near-instant and worker processes share pages.
+
+Usage:
+    python scenario_cache.py warm      # generate every registered scenario
+    python scenario_cache.py prune     # drop entries no loaded registry references
+    python scenario_cache.py clear     # delete the whole cache
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+from scenario_store import ColumnarRaceData, DriverTelemetry
+
+CACHE_DIR = Path(os.environ.get("RACE_ORACLE_CACHE_DIR", Path(__file__).parent / "cache" / "scenarios"))
+CACHE_ENABLED = os.environ.get("RACE_ORACLE_SCENARIO_CACHE", "1") != "0"
+
+MANIFEST_NAME = "manifest.json"
+
+# (path, mtime_ns, size) -> sha256 of the file contents
+_fingerprints: Dict = {}
+
+
+def file_fingerprint(path) -> str:
+    """SHA-256 of a file, memoized until its mtime or size changes"""
+    path = Path(path)
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    digest = _fingerprints.get(memo_key)
+    if digest is None:
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        _fingerprints[memo_key] = digest
+    return digest
+
+
+def cache_key(generator: str, version: int, params: Dict, track_hash: Optional[str] = None) -> str:
+    """Key for one scenario: generator name/version, track contents and generation parameters"""
+    payload = json.dumps(
+        {"generator": generator, "version": version, "track": track_hash, "params": params},
+        sort_keys=True,
+    )
+    return f"{generator}-{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+
+class ScenarioCache:
+    """Directory of cached scenarios, one sub-directory of .npy columns per key"""
+
+    def __init__(self, root=CACHE_DIR, enabled: bool = CACHE_ENABLED):
+        self.root = Path(root)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, key: str, track_xy: Optional[np.ndarray] = None) -> Optional[ColumnarRaceData]:
+        """Memory-map a cached scenario, or None if it is not cached"""
+        entry = self.root / key
+        try:
+            with open(entry / MANIFEST_NAME, 'r') as f:
+                manifest = json.load(f)
+            drivers = {}
+            for driver_id, spec in manifest["drivers"].items():
+                columns = {
+                    name: np.load(entry / f"{driver_id}.{name}.npy", mmap_mode="r")
+                    for name in spec["columns"]
+                }
+                drivers[driver_id] = DriverTelemetry(columns, constants=spec["constants"], track_xy=track_xy)
+        except (OSError, ValueError, KeyError):
+            return None
+        return ColumnarRaceData(drivers)
+
+    def store(self, key: str, race_data: ColumnarRaceData):
+        """Write a scenario atomically (build in a temp dir, then rename)"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{key}.", dir=self.root))
+        try:
+            manifest = {"drivers": {}}
+            for driver_id, telemetry in race_data.items():
+                for name, column in telemetry.columns.items():
+                    np.save(staging / f"{driver_id}.{name}.npy", column)
+                manifest["drivers"][driver_id] = {
+                    "columns": list(telemetry.columns),
+                    "constants": telemetry.constants,
+                }
+            with open(staging / MANIFEST_NAME, 'w') as f:
+                json.dump(manifest, f)
+            os.replace(staging, self.root / key)
+        except OSError:
+            # Another process may have stored the same key first
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def get_or_build(self, key: str, build: Callable[[], ColumnarRaceData], track_xy: Optional[np.ndarray] = None) -> ColumnarRaceData:
+        """Load from disk if present, otherwise build, store and memory-map"""
+        if not self.enabled:
+            return build()
+        race_data = self.load(key, track_xy)
+        if race_data is not None:
+            self.hits += 1
+            return race_data
+        self.misses += 1
+        race_data = build()
+        try:
+            self.store(key, race_data)
+        except OSError as e:
+            print(f"⚠ Scenario cache write failed: {e}")
+            return race_data
+        return self.load(key, track_xy) or race_data
+
+    def keys(self) -> Iterable[str]:
+        if not self.root.exists():
+            return []
+        return [p.name for p in self.root.iterdir() if p.is_dir() and not p.name.startswith(".")]
+
+    def prune(self, live_keys: Iterable[str], generators: Iterable[str]) -> int:
+        """
+        Remove entries of the given generators that are not in live_keys
+        (e.g. after a track JSON changed and its scenarios were re-keyed).
+        """
+        live = set(live_keys)
+        prefixes = tuple(f"{generator}-" for generator in generators)
+        removed = 0
+        for key in self.keys():
+            if key.startswith(prefixes) and key not in live:
+                shutil.rmtree(self.root / key, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+SCENARIO_CACHE = ScenarioCache()
+
+
+def _registered_modules():
+    """Data modules whose scenarios are cached (real-track one only if its track loads)"""
+    import race_data
+    modules = [race_data]
+    try:
+        import race_data_real
+        modules.append(race_data_real)
+    except Exception as e:
+        print(f"⚠ Skipping real-track scenarios: {e}")
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the on-disk scenario cache")
+    parser.add_argument("command", choices=["warm", "prune", "clear"])
+    args = parser.parse_args()
+
+    if args.command == "clear":
+        SCENARIO_CACHE.clear()
+        print(f"✓ Cleared {SCENARIO_CACHE.root}")
+        return
+
+    modules = _registered_modules()
+    live_keys = [
+        module.scenario_cache_key(meta)
+        for module in modules
+        for meta in module.RACE_SCENARIOS.metadata
+    ]
+    removed = SCENARIO_CACHE.prune(live_keys, [module.__name__ for module in modules])
+    print(f"✓ Pruned {removed} stale cache entries")
+
+    if args.command == "warm":
+        for module in modules:
+            registry = module.RACE_SCENARIOS
+            for scenario_id in range(len(registry)):
+                registry.get(scenario_id)
+            print(f"✓ Warmed {len(registry)} scenarios from {module.__name__}")
+
+
+if __name__ == "__main__":
+    main()
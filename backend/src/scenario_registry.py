@@ -0,0 +1,99 @@
+"""
+Lazy scenario registry for Race Oracle
+Serves scenario metadata up front and generates telemetry on first use
+"""
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Callable, Dict, List
+
+from metrics import METRICS
+
+# Memory budget for materialized scenarios (per worker process)
+DEFAULT_CACHE_MB = float(os.environ.get("RACE_ORACLE_SCENARIO_CACHE_MB", "256"))
+
+SCENARIO_BUILD_SECONDS = METRICS.histogram(
+    "race_oracle_scenario_build_seconds",
+    "Time to generate (or load from the disk cache) a scenario's telemetry on a registry miss",
+)
+
+
+class ScenarioRegistry(Sequence):
+    """
+    Sequence of scenarios whose telemetry is built on demand.
+    `metadata` is available without generating anything; indexing returns the
+    full scenario dict (metadata + "race_data"), generated on first access and
+    kept in an LRU cache bounded by the bytes held in telemetry columns.
+    """
+
+    def __init__(self, metadata: List[Dict], build: Callable[[Dict], object], max_bytes: float = DEFAULT_CACHE_MB * 1024 * 1024):
+        self.metadata = metadata
+        self._build = build
+        self.max_bytes = max_bytes
+        self.cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[int, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+    def __getitem__(self, scenario_id):
+        if isinstance(scenario_id, slice):
+            return [self[i] for i in range(*scenario_id.indices(len(self)))]
+        if scenario_id < 0:
+            scenario_id += len(self)
+        if not 0 <= scenario_id < len(self):
+            raise IndexError("scenario index out of range")
+        return self.get(scenario_id)
+
+    def get(self, scenario_id: int) -> Dict:
+        """Return the full scenario, generating its telemetry if not cached"""
+        with self._lock:
+            scenario = self._cache.get(scenario_id)
+            if scenario is not None:
+                self._cache.move_to_end(scenario_id)
+                self.hits += 1
+                return scenario
+            self.misses += 1
+
+        # Generate outside the lock so other scenarios stay servable meanwhile
+        meta = self.metadata[scenario_id]
+        scenario = dict(meta)
+        with SCENARIO_BUILD_SECONDS.time():
+            scenario["race_data"] = self._build(meta)
+
+        with self._lock:
+            existing = self._cache.get(scenario_id)
+            if existing is not None:
+                self._cache.move_to_end(scenario_id)
+                return existing
+            self._cache[scenario_id] = scenario
+            self.cached_bytes += _scenario_nbytes(scenario)
+            self._evict(keep=scenario_id)
+        return scenario
+
+    def is_cached(self, scenario_id: int) -> bool:
+        return scenario_id in self._cache
+
+    def clear(self):
+        """Drop every materialized scenario"""
+        with self._lock:
+            self._cache.clear()
+            self.cached_bytes = 0
+
+    def _evict(self, keep: int):
+        """Drop least recently used scenarios until under the memory budget"""
+        while self.cached_bytes > self.max_bytes and len(self._cache) > 1:
+            scenario_id = next(iter(self._cache))
+            if scenario_id == keep:
+                self._cache.move_to_end(scenario_id)
+                continue
+            evicted = self._cache.pop(scenario_id)
+            self.cached_bytes -= _scenario_nbytes(evicted)
+
+
+def _scenario_nbytes(scenario: Dict) -> int:
+    return getattr(scenario["race_data"], "nbytes", 0)
@@ -0,0 +1,218 @@
+"""
+Columnar scenario storage for Race Oracle
+Keeps each driver's telemetry as typed NumPy columns instead of per-sample dicts
+"""
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Status strings are stored as small integer codes
+STATUS_CODES = ["Racing", "Finished"]
+STATUS_INDEX = {status: code for code, status in enumerate(STATUS_CODES)}
+
+# Column name -> storage dtype
+COLUMN_DTYPES = {
+    "time": np.float64,
+    "lap": np.uint16,
+    "distance": np.float32,
+    "track_position": np.float32,
+    "speed": np.float32,
+    "tire_wear": np.float32,
+    "tire_temp": np.float32,
+    "status": np.uint8,
+    "track_point": np.uint32,
+}
+
+# Columns published with one decimal, as in the original per-sample dicts
+ROUNDED_COLUMNS = ("speed", "tire_wear", "tire_temp")
+
+# Order in which numeric columns appear in a materialized point
+RECORD_COLUMNS = ["time", "lap", "distance", "track_position", "speed", "tire_wear", "tire_temp"]
+
+
+class DriverTelemetry(Sequence):
+    """
+    One driver's telemetry stored as typed columns.
+    Indexing returns the same point dicts the list-of-dicts format used, so
+    code written against `race_data[driver_id][i]["speed"]` keeps working.
+    """
+
+    def __init__(self, columns: Dict, constants: Optional[Dict] = None, track_xy: Optional[np.ndarray] = None):
+        self.columns = {
+            name: np.ascontiguousarray(values, dtype=COLUMN_DTYPES[name])
+            for name, values in columns.items()
+        }
+        self.constants = constants or {}
+        # Shared (num_points, 2) array of track coordinates for "track_point" lookups
+        self.track_xy = track_xy
+        self.time = self.columns["time"]
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.point(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("telemetry index out of range")
+        return self.point(index)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by this driver's columns (shared track coordinates excluded)"""
+        return sum(column.nbytes for column in self.columns.values())
+
+    def index_at(self, time_seconds: float) -> int:
+        """Index of the last sample at or before time_seconds (-1 if none)"""
+        # Binary search over the sorted time column: O(log n) in race length
+        return int(np.searchsorted(self.time, time_seconds, side="right")) - 1
+
+    def sample_at(self, time_seconds: float, interpolate: bool = False, track_length: Optional[float] = None) -> Optional[Dict]:
+        """
+        Point dict for time_seconds, or None before the first sample.
+        With interpolate=True, speed, distance and track_position are blended
+        linearly towards the next sample while both samples are racing.
+        """
+        index = self.index_at(time_seconds)
+        if index < 0:
+            return None
+        point = self.point(index)
+        if not interpolate or index + 1 >= len(self):
+            return point
+
+        status = self.columns.get("status")
+        if status is not None and (status[index] != STATUS_INDEX["Racing"] or status[index + 1] != STATUS_INDEX["Racing"]):
+            return point
+
+        t0 = self.time[index]
+        t1 = self.time[index + 1]
+        if t1 <= t0:
+            return point
+        fraction = float((time_seconds - t0) / (t1 - t0))
+
+        speed = self.columns["speed"]
+        distance = self.columns["distance"]
+        position = self.columns["track_position"]
+        point["speed"] = round(float(speed[index]) + (float(speed[index + 1]) - float(speed[index])) * fraction, 1)
+        point["distance"] = float(distance[index]) + (float(distance[index + 1]) - float(distance[index])) * fraction
+
+        # Track position wraps at the start/finish line
+        delta = float(position[index + 1]) - float(position[index])
+        if delta < 0 and track_length:
+            delta += track_length
+        track_position = float(position[index]) + delta * fraction
+        if track_length and track_position >= track_length:
+            track_position -= track_length
+            point["lap"] += 1
+        point["track_position"] = track_position
+        return point
+
+    def take(self, indices) -> "DriverTelemetry":
+        """Telemetry holding only the samples at indices (a slice or sorted index array)"""
+        columns = {name: column[indices] for name, column in self.columns.items()}
+        return DriverTelemetry(columns, constants=self.constants, track_xy=self.track_xy)
+
+    def window(self, t0: Optional[float] = None, t1: Optional[float] = None) -> slice:
+        """
+        Slice of the samples covering [t0, t1], including the samples just
+        outside it so the window can be interpolated up to its edges.
+        """
+        start = 0 if t0 is None else max(0, self.index_at(t0))
+        stop = len(self) if t1 is None else min(len(self), int(np.searchsorted(self.time, t1, side="left")) + 1)
+        return slice(start, max(start, stop))
+
+    def point(self, index: int) -> Dict:
+        """Materialize a single sample as a point dict"""
+        point = {}
+        for name in RECORD_COLUMNS:
+            if name in self.columns:
+                value = self.columns[name][index].item()
+                point[name] = round(value, 1) if name in ROUNDED_COLUMNS else value
+        if "status" in self.columns:
+            point["status"] = STATUS_CODES[self.columns["status"][index]]
+        if "track_point" in self.columns and self.track_xy is not None:
+            x, y = self.track_xy[self.columns["track_point"][index]]
+            point["x"] = float(x)
+            point["y"] = float(y)
+        point.update(self.constants)
+        return point
+
+    def field_names(self) -> List[str]:
+        """Keys of a materialized point, in order"""
+        names = [name for name in RECORD_COLUMNS if name in self.columns]
+        if "status" in self.columns:
+            names.append("status")
+        if "track_point" in self.columns and self.track_xy is not None:
+            names += ["x", "y"]
+        return names + list(self.constants)
+
+    def to_records(self, fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Materialize every sample as a list of point dicts (optionally only some fields)"""
+        wanted = set(self.field_names() if fields is None else fields)
+        names = [name for name in RECORD_COLUMNS if name in self.columns and name in wanted]
+        values = [self.columns[name].tolist() for name in names]
+        values = [
+            [round(v, 1) for v in column] if name in ROUNDED_COLUMNS else column
+            for name, column in zip(names, values)
+        ]
+        extra_names = []
+        if "status" in self.columns and "status" in wanted:
+            extra_names.append("status")
+            values.append([STATUS_CODES[code] for code in self.columns["status"].tolist()])
+        if "track_point" in self.columns and self.track_xy is not None and wanted & {"x", "y"}:
+            xy = self.track_xy[self.columns["track_point"]]
+            for axis, name in enumerate(("x", "y")):
+                if name in wanted:
+                    extra_names.append(name)
+                    values.append(xy[:, axis].tolist())
+        constants = {name: value for name, value in self.constants.items() if name in wanted}
+
+        keys = names + extra_names
+        if not keys:
+            return [dict(constants) for _ in range(len(self))]
+        records = []
+        for row in zip(*values):
+            point = dict(zip(keys, row))
+            point.update(constants)
+            records.append(point)
+        return records
+
+
+class ColumnarRaceData(Mapping):
+    """Mapping of driver_id -> DriverTelemetry for one scenario"""
+
+    def __init__(self, drivers: Optional[Dict[str, DriverTelemetry]] = None):
+        self.drivers = dict(drivers or {})
+
+    def __getitem__(self, driver_id: str) -> DriverTelemetry:
+        return self.drivers[driver_id]
+
+    def __iter__(self):
+        return iter(self.drivers)
+
+    def __len__(self) -> int:
+        return len(self.drivers)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(telemetry.nbytes for telemetry in self.drivers.values())
+
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> Dict[str, List[Dict]]:
+        """Materialize the list-of-dicts format used by the JSON API"""
+        return {driver_id: telemetry.to_records(fields) for driver_id, telemetry in self.drivers.items()}
+
+
+def race_data_to_dict(race_data, fields: Optional[Iterable[str]] = None) -> Dict[str, List[Dict]]:
+    """Return a JSON-ready race_data dict for columnar or plain race data"""
+    if isinstance(race_data, ColumnarRaceData):
+        return race_data.to_dict(fields)
+    if fields is None:
+        return race_data
+    wanted = set(fields)
+    return {
+        driver_id: [{k: v for k, v in point.items() if k in wanted} for point in points]
+        for driver_id, points in race_data.items()
+    }
@@ -5,6 +5,12 @@ Manages race state, events, and weather
 import random
 from typing import List, Dict, Optional
 from physics import Vehicle, Driver, Tire
+from physics_batch import BatchedField
+from profiler import PROFILER
+from track_index import TrackIndex, get_track_index
+
+# Physics backends selectable through configure({"backend": ...})
+BACKENDS = ("object", "batched")
 
 
 class Simulation:
@@ -13,19 +19,39 @@ class Simulation:
     def __init__(self):
         self.vehicles: List[Vehicle] = []
         self.track_data: List[Dict] = []
+        # Shared lookup tables for track_data
+        self.track: Optional[TrackIndex] = None
         self.track_name: str = ""
         self.global_weather: str = "Dry"
         self.chaos_level: float = 0.0
         self.is_running: bool = False
         self.simulation_time: float = 0.0
         self.dt: float = 0.05  # 50ms time step
+        self.backend: str = "object"
+        # Struct-of-arrays state when the batched backend is selected
+        self.field: Optional[BatchedField] = None
         
     def configure(self, params: Dict):
-        """Set up simulation with given parameters"""
+        """
+        Set up simulation with given parameters.
+        A prebuilt "track_index" for track_data is used as is; otherwise the
+        shared index of track_data is used (or built, when "sectors" are given).
+        """
         self.track_name = params.get("track", "Monza")
         self.track_data = params.get("track_data", [])
+        if params.get("track_index") is not None:
+            self.track = params["track_index"]
+        elif not self.track_data:
+            self.track = None
+        elif params.get("sectors"):
+            self.track = TrackIndex(self.track_data, params["sectors"])
+        else:
+            self.track = get_track_index(self.track_data)
         self.global_weather = params.get("weather", "Dry")
         self.chaos_level = params.get("chaos_level", 0.0)
+        self.backend = params.get("backend", "object")
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown physics backend: {self.backend}")
         
         # Create vehicles from agent configs
         self.vehicles = []
@@ -54,13 +80,9 @@ class Simulation:
                 
             # Create vehicle with staggered start positions
             start_position = 0
-            if self.track_data:
+            if self.track is not None:
                 # Find track index for starting distance
-                start_distance = i * spacing_distance
-                for idx, point in enumerate(self.track_data):
-                    if point["distance"] >= start_distance:
-                        start_position = idx
-                        break
+                start_position = max(0, self.track.locate(i * spacing_distance))
             
             vehicle = Vehicle(driver, tire, start_position)
             
@@ -76,6 +98,9 @@ class Simulation:
             
             self.vehicles.append(vehicle)
             
+        # The batched backend owns vehicle state; Vehicle objects are synced on demand
+        self.field = BatchedField(self.vehicles, self.track_data, self.track) if self.backend == "batched" else None
+            
         self.is_running = True
         self.simulation_time = 0.0
         
@@ -83,17 +108,35 @@ class Simulation:
         """Main simulation update loop"""
         if not self.is_running:
             return
-            
+        if PROFILER.enabled:
+            with PROFILER.tick("simulation", phase="physics"):
+                self._step()
+        else:
+            self._step()
+        
+    def _step(self):
+        """One fixed timestep: vehicles, then random events"""
         # Update all vehicles
-        for vehicle in self.vehicles:
-            vehicle.update(self.dt, self.track_data)
+        if self.field is not None:
+            self.field.step(self.dt)
+        else:
+            for vehicle in self.vehicles:
+                vehicle.update(self.dt, self.track_data, self.track)
             
         # Check for random events based on chaos level
         if random.random() < self.chaos_level * 0.001:
+            self.sync_vehicles()
             self._trigger_random_event()
+            if self.field is not None:
+                self.field.load(self.vehicles)
             
         self.simulation_time += self.dt
         
+    def sync_vehicles(self):
+        """Bring Vehicle objects up to date with the batched state (no-op for the object backend)"""
+        if self.field is not None:
+            self.field.store(self.vehicles)
+        
     def _trigger_random_event(self):
         """Trigger random race events"""
         if not self.vehicles:
@@ -114,12 +157,15 @@ class Simulation:
         self.global_weather = weather
         
         # Apply weather effects to all tires
+        self.sync_vehicles()
         multiplier = 0.7 if weather == "Wet" else 1.0
         for vehicle in self.vehicles:
             base_compound = vehicle.tire.compound
             vehicle.tire = Tire(base_compound)
             if weather == "Wet":
                 vehicle.tire.base_grip_multiplier *= multiplier
+        if self.field is not None:
+            self.field.load(self.vehicles)
                 
     def set_chaos(self, level: float):
         """Set chaos level (0.0 to 1.0)"""
@@ -132,15 +178,23 @@ class Simulation:
     def reset(self):
         """Reset simulation state"""
         self.vehicles = []
+        self.field = None
         self.is_running = False
         self.simulation_time = 0.0
         
     def get_state_snapshot(self) -> Dict:
         """Get current simulation state for broadcasting"""
+        self.sync_vehicles()
         return {
             "time": self.simulation_time,
             "track": self.track_name,
             "weather": self.global_weather,
             "chaos_level": self.chaos_level,
-            "vehicles": [vehicle.get_telemetry() for vehicle in self.vehicles],
+            "vehicles": [self._vehicle_telemetry(vehicle) for vehicle in self.vehicles],
         }
+        
+    def _vehicle_telemetry(self, vehicle: Vehicle) -> Dict:
+        telemetry = vehicle.get_telemetry()
+        sector = self.track.sector_at(vehicle.distance_on_track) if self.track is not None else None
+        telemetry["sector"] = sector["type"] if sector else None
+        return telemetry
@@ -0,0 +1,114 @@
+"""
+On-disk columnar store for real driver telemetry
+One .npy file (structured array of typed columns) per (year, circuit,
+driver, lap), written atomically, so backfills append lap by lap and skip
+laps already stored. Files are memory-mapped on load.
+
+Usage:
+    python telemetry_store.py backfill 2024 Monza VER,HAM,LEC
+    python telemetry_store.py list 2024 Monza
+"""
+import argparse
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+STORE_DIR = Path(os.environ.get("RACE_ORACLE_TELEMETRY_DIR", Path(__file__).parent / "cache" / "telemetry"))
+
+# Column name -> storage dtype (time is seconds since the start of the lap)
+TELEMETRY_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("speed", "<f4"),
+    ("throttle", "<f4"),
+    ("brake", "<f4"),
+    ("x", "<f8"),
+    ("y", "<f8"),
+])
+
+
+class TelemetryStore:
+    """Directory tree root/{year}/{circuit}/{driver}/lap_NNN.npy"""
+
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+
+    def driver_dir(self, year: int, circuit: str, driver: str) -> Path:
+        return self.root / str(year) / circuit.lower() / driver.upper()
+
+    def lap_path(self, year: int, circuit: str, driver: str, lap: int) -> Path:
+        return self.driver_dir(year, circuit, driver) / f"lap_{lap:03d}.npy"
+
+    def has_lap(self, year: int, circuit: str, driver: str, lap: int) -> bool:
+        return self.lap_path(year, circuit, driver, lap).exists()
+
+    def laps(self, year: int, circuit: str, driver: str) -> List[int]:
+        directory = self.driver_dir(year, circuit, driver)
+        if not directory.exists():
+            return []
+        return sorted(int(p.stem[4:]) for p in directory.glob("lap_*.npy"))
+
+    def drivers(self, year: int, circuit: str) -> List[str]:
+        directory = self.root / str(year) / circuit.lower()
+        if not directory.exists():
+            return []
+        return sorted(p.name for p in directory.iterdir() if p.is_dir())
+
+    def append_lap(self, year: int, circuit: str, driver: str, lap: int, columns: Dict[str, np.ndarray]):
+        """Store one lap's columns (written to a temp file, then renamed into place)"""
+        length = len(columns["time"])
+        records = np.empty(length, dtype=TELEMETRY_DTYPE)
+        for name in TELEMETRY_DTYPE.names:
+            records[name] = columns[name]
+
+        path = self.lap_path(year, circuit, driver, lap)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, staging = tempfile.mkstemp(prefix=f".{path.stem}.", suffix=".npy", dir=path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, records)
+            os.replace(staging, path)
+        except OSError:
+            Path(staging).unlink(missing_ok=True)
+            raise
+
+    def load(self, year: int, circuit: str, driver: str, laps: Optional[Iterable[int]] = None) -> Dict[str, np.ndarray]:
+        """Columns of the given (default: all stored) laps, concatenated, plus a "lap" column"""
+        laps = self.laps(year, circuit, driver) if laps is None else list(laps)
+        parts = [np.load(self.lap_path(year, circuit, driver, lap), mmap_mode="r") for lap in laps]
+        if not parts:
+            columns = {name: np.empty(0, dtype=TELEMETRY_DTYPE[name]) for name in TELEMETRY_DTYPE.names}
+            columns["lap"] = np.empty(0, dtype=np.uint16)
+            return columns
+        columns = {name: np.concatenate([part[name] for part in parts]) for name in TELEMETRY_DTYPE.names}
+        columns["lap"] = np.repeat(np.array(laps, dtype=np.uint16), [len(part) for part in parts])
+        return columns
+
+
+TELEMETRY_STORE = TelemetryStore()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the on-disk driver telemetry store")
+    parser.add_argument("command", choices=["backfill", "list"])
+    parser.add_argument("year", type=int)
+    parser.add_argument("circuit")
+    parser.add_argument("drivers", nargs="?", default="", help="Comma-separated driver codes (backfill)")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for driver in TELEMETRY_STORE.drivers(args.year, args.circuit):
+            laps = TELEMETRY_STORE.laps(args.year, args.circuit, driver)
+            print(f"  {driver}: {len(laps)} laps")
+        return
+
+    from fetch_real_data import backfill_driver_telemetry, load_session
+    session = load_session(args.year, args.circuit, 'Race')
+    for driver in filter(None, args.drivers.split(",")):
+        backfill_driver_telemetry(args.year, args.circuit, driver, session=session)
+
+
+if __name__ == "__main__":
+    main()
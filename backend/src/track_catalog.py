@@ -0,0 +1,198 @@
+"""
+Track catalog for Race Oracle
+Indexes the metadata of every track file once, re-scans the directory when
+it changes (polled at most every POLL_INTERVAL seconds) and loads a track's
+geometry, TrackIndex and sector table only when that track is first used.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from track_index import TrackIndex
+from track_sectors import SectorTable
+from track_store import compact_path
+
+TRACKS_DIR = Path(os.environ.get(
+    "RACE_ORACLE_TRACKS_DIR", Path(__file__).resolve().parent.parent.parent / "public" / "tracks"
+))
+TRACK_GLOB = "*_track*.json"
+
+# Minimum seconds between directory scans
+POLL_INTERVAL = 2.0
+
+FileSignature = Tuple[int, int]
+
+
+def track_id_for(path: Path) -> str:
+    """Catalog id of a track file: monza_track.json -> monza, monza_track_real.json -> monza_real"""
+    return path.stem.replace("_track", "", 1)
+
+
+def _file_signature(path: Path) -> Optional[FileSignature]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_track_metadata(path: Path) -> Dict:
+    """
+    Track fields without the points. Read from the .npz twin when it is at
+    least as new as the JSON (no per-point parsing), else from the JSON.
+    """
+    npz_path = compact_path(path)
+    if npz_path.exists() and npz_path.stat().st_mtime_ns >= path.stat().st_mtime_ns:
+        with np.load(npz_path) as data:
+            meta = json.loads(str(data["meta"]))
+            meta["num_points"] = len(data["x"])
+            meta["has_speed"] = "speed" in data.files
+    else:
+        with open(path, 'r') as f:
+            track_data = json.load(f)
+        points = track_data.get("points", [])
+        meta = {k: v for k, v in track_data.items() if k != "points"}
+        meta["num_points"] = len(points)
+        meta["has_speed"] = bool(points) and "speed" in points[0]
+    meta.pop("sectors", None)
+    return meta
+
+
+class Track:
+    """One catalog entry: metadata up front, geometry on first access"""
+
+    def __init__(self, track_id: str, path: Path, signature: FileSignature, meta: Dict):
+        self.id = track_id
+        self.path = path
+        self.signature = signature
+        self.meta = meta
+        self._lock = threading.Lock()
+        self._data: Optional[Dict] = None
+        self._index: Optional[TrackIndex] = None
+        self._sectors: Optional[SectorTable] = None
+        self._xy: Optional[np.ndarray] = None
+
+    @property
+    def name(self) -> str:
+        return self.meta.get("track_name", self.id)
+
+    @property
+    def length(self) -> float:
+        return self.meta.get("total_length", 0)
+
+    def summary(self) -> Dict:
+        """Entry of the /data/tracks listing"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "file": self.path.name,
+            "length": self.length,
+            "year": self.meta.get("year"),
+            "num_points": self.meta["num_points"],
+        }
+
+    def load(self) -> Dict:
+        """Full track JSON (parsed once)"""
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    with open(self.path, 'r') as f:
+                        self._data = json.load(f)
+        return self._data
+
+    @property
+    def points(self) -> List[Dict]:
+        return self.load()["points"]
+
+    @property
+    def sectors(self) -> SectorTable:
+        if self._sectors is None:
+            self._sectors = SectorTable.from_track(self.load())
+        return self._sectors
+
+    @property
+    def index(self) -> TrackIndex:
+        if self._index is None:
+            self._index = TrackIndex(self.points, self.sectors.sectors)
+        return self._index
+
+    @property
+    def xy(self) -> np.ndarray:
+        """(n, 2) array of point coordinates"""
+        if self._xy is None:
+            self._xy = np.array([[p['x'], p['y']] for p in self.points], dtype=np.float64)
+        return self._xy
+
+
+class TrackCatalog:
+    """Tracks of a directory by id; call sites get fresh entries after a file changes"""
+
+    def __init__(self, directory=TRACKS_DIR, poll_interval: float = POLL_INTERVAL):
+        self.directory = Path(directory)
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._tracks: Dict[str, Track] = {}
+        self._last_scan: Optional[float] = None
+        self.refresh(force=True)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Re-scan the directory (throttled unless forced); True if any track changed"""
+        now = time.monotonic()
+        if not force and self._last_scan is not None and now - self._last_scan < self.poll_interval:
+            return False
+        with self._lock:
+            self._last_scan = now
+            paths = sorted(self.directory.glob(TRACK_GLOB)) if self.directory.exists() else []
+            tracks = {}
+            for path in paths:
+                signature = _file_signature(path)
+                if signature is None:
+                    continue
+                track_id = track_id_for(path)
+                current = self._tracks.get(track_id)
+                if current is not None and current.signature == signature:
+                    tracks[track_id] = current
+                    continue
+                try:
+                    tracks[track_id] = Track(track_id, path, signature, read_track_metadata(path))
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"⚠ Skipping track {path.name}: {e}")
+            changed = tracks.keys() != self._tracks.keys() or any(
+                tracks[k] is not self._tracks[k] for k in tracks
+            )
+            self._tracks = tracks
+        return changed
+
+    def ids(self) -> List[str]:
+        self.refresh()
+        return list(self._tracks)
+
+    def tracks(self) -> List[Track]:
+        self.refresh()
+        return list(self._tracks.values())
+
+    def get(self, track_id: str) -> Track:
+        """Track by id (KeyError if the catalog has no such track)"""
+        self.refresh()
+        try:
+            return self._tracks[track_id]
+        except KeyError:
+            raise KeyError(f"Unknown track: {track_id}") from None
+
+    def __contains__(self, track_id: str) -> bool:
+        self.refresh()
+        return track_id in self._tracks
+
+    @property
+    def signature(self) -> Tuple:
+        """(id, mtime_ns, size) of every indexed file; changes when the catalog does"""
+        self.refresh()
+        return tuple((track_id, *track.signature) for track_id, track in self._tracks.items())
+
+
+TRACK_CATALOG = TrackCatalog()
@@ -0,0 +1,134 @@
+"""
+Track index for Race Oracle
+Precomputed per-track lookup tables shared by every vehicle on the track:
+segment lookup by distance plus the driving profile (curvature, corner
+factor, target speed, steering lookahead heading) for every point.
+"""
+import math
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from track_sectors import SectorTable
+
+# How many points past the hint are checked before falling back to bisect
+HINT_WINDOW = 4
+
+# Driving profile constants (see Vehicle._get_target_speed / Driver._calculate_steering)
+STRAIGHT_SPEED = 90.0  # m/s (~324 km/h)
+SPEED_LOOKAHEAD = 20   # points scanned ahead for corners
+STEER_LOOKAHEAD = 5    # points ahead the driver aims at
+
+
+class TrackIndex:
+    """
+    Cumulative distance, coordinates and per-segment headings of a track.
+    Built once per track and shared; lookups continue from the caller's
+    previous index and fall back to a binary search.
+    """
+
+    def __init__(self, track_data: List[Dict], sectors: Optional[List[Dict]] = None):
+        self.points = track_data
+        self.size = len(track_data)
+        self.distances = [p["distance"] for p in track_data]
+        self.xs = [p["x"] for p in track_data]
+        self.ys = [p["y"] for p in track_data]
+        self.total_length = self.distances[-1] if track_data else 0.0
+
+        # Heading of the segment leaving each point (None for the last point)
+        self.segment_headings: List[Optional[float]] = [
+            math.atan2(self.ys[i + 1] - self.ys[i], self.xs[i + 1] - self.xs[i])
+            for i in range(self.size - 1)
+        ] + ([None] if track_data else [])
+
+        self._build_profile()
+
+        # Persisted sector table if given, otherwise segmented from point speeds
+        self.sectors = SectorTable(sectors) if sectors else SectorTable.from_points(track_data)
+
+        # Array views for vectorized consumers
+        self.distance_array = np.array(self.distances, dtype=np.float64)
+        self.x_array = np.array(self.xs, dtype=np.float64)
+        self.y_array = np.array(self.ys, dtype=np.float64)
+        self.heading_array = np.array(
+            [h if h is not None else 0.0 for h in self.segment_headings], dtype=np.float64
+        )
+
+    def _build_profile(self):
+        """Per-point curvature, corner factor, target speed and steering heading"""
+        n = self.size
+        xs, ys = self.xs, self.ys
+        self.angle_changes = [0.0] * n
+        self.corner_factors = [1.0] * n
+        self.target_speeds = [STRAIGHT_SPEED] * n
+        self.lookahead_headings = [0.0] * n
+
+        for i in range(n):
+            # Reduce speed in corners based on curvature
+            if i + SPEED_LOOKAHEAD < n:
+                i2 = i + SPEED_LOOKAHEAD // 2
+                i3 = i + SPEED_LOOKAHEAD - 1
+                angle1 = math.atan2(ys[i2] - ys[i], xs[i2] - xs[i])
+                angle2 = math.atan2(ys[i3] - ys[i2], xs[i3] - xs[i2])
+                angle_change = abs(angle2 - angle1)
+                if angle_change > math.pi:
+                    angle_change = 2 * math.pi - angle_change
+
+                # Sharp corners (angle > 0.5 rad) need much slower speeds
+                if angle_change > 0.5:
+                    corner_factor = max(0.3, 1.0 - angle_change * 1.5)
+                elif angle_change > 0.2:
+                    corner_factor = max(0.6, 1.0 - angle_change * 0.8)
+                else:
+                    corner_factor = 1.0
+
+                self.angle_changes[i] = angle_change
+                self.corner_factors[i] = corner_factor
+                self.target_speeds[i] = STRAIGHT_SPEED * corner_factor
+
+            # Desired heading towards the steering lookahead point
+            if n >= 2:
+                target = (i + STEER_LOOKAHEAD) % n
+                self.lookahead_headings[i] = math.atan2(ys[target] - ys[i], xs[target] - xs[i])
+
+        self.target_speed_array = np.array(self.target_speeds, dtype=np.float64)
+        self.lookahead_heading_array = np.array(self.lookahead_headings, dtype=np.float64)
+
+    def sector_at(self, distance: float) -> Optional[Dict]:
+        """Sector containing a distance along the lap (None if the track has no sectors)"""
+        return self.sectors.sector_at(distance)
+
+    def locate(self, distance: float, hint: int = 0) -> int:
+        """
+        Index of the first point whose distance is >= distance, or -1 if the
+        distance is past the last point. `hint` is the previous result.
+        """
+        distances = self.distances
+        if 0 <= hint < self.size:
+            for i in range(hint, min(hint + HINT_WINDOW, self.size)):
+                if distances[i] >= distance:
+                    if i == 0 or distances[i - 1] < distance:
+                        return i
+                    break
+        i = bisect_left(distances, distance)
+        return i if i < self.size else -1
+
+
+# Indexes of recently used tracks, keyed by the identity of their point list
+_INDEXES: "OrderedDict[int, TrackIndex]" = OrderedDict()
+_MAX_INDEXES = 16
+
+
+def get_track_index(track_data: List[Dict]) -> TrackIndex:
+    """Shared TrackIndex for a track point list (built on first use)"""
+    index = _INDEXES.get(id(track_data))
+    if index is not None and index.points is track_data:
+        _INDEXES.move_to_end(id(track_data))
+        return index
+    index = TrackIndex(track_data)
+    _INDEXES[id(track_data)] = index
+    while len(_INDEXES) > _MAX_INDEXES:
+        _INDEXES.popitem(last=False)
+    return index
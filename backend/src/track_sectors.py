@@ -0,0 +1,113 @@
+"""
+Track sector segmentation for Race Oracle
+Splits a track into straight/medium/corner sectors by speed (run-length
+encoding over the points) and looks up the sector of any distance by
+binary search over the sector start distances.
+"""
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+import numpy as np
+
+SECTOR_TYPES = ["straight", "medium", "corner"]
+
+# Runs of this many points or fewer are folded into the sector before them
+# (a short run at the start of the track into the sector after it)
+MIN_SECTOR_POINTS = 10
+
+
+def classify_points(speeds: np.ndarray) -> np.ndarray:
+    """Sector type code per point: straight above 1.2x, corner below 0.7x the mean speed"""
+    speeds = np.asarray(speeds, dtype=np.float64)
+    avg_speed = speeds.mean()
+    codes = np.full(len(speeds), SECTOR_TYPES.index("medium"), dtype=np.int8)
+    codes[speeds > avg_speed * 1.2] = SECTOR_TYPES.index("straight")
+    codes[speeds < avg_speed * 0.7] = SECTOR_TYPES.index("corner")
+    return codes
+
+
+def segment_sectors(distances: np.ndarray, speeds: np.ndarray, min_points: int = MIN_SECTOR_POINTS) -> List[Dict]:
+    """
+    Contiguous sectors covering the whole track. Short runs are merged into
+    the preceding sector; a short first run has none, so it is merged into
+    the following one. Neighbours of the same type are then joined.
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    speeds = np.asarray(speeds, dtype=np.float64)
+    n = len(speeds)
+    if n == 0:
+        return []
+
+    codes = classify_points(speeds)
+    starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+    counts = np.diff(np.append(starts, n))
+
+    # Drop short runs (they become part of the previous sector)
+    keep = counts > min_points
+    keep[0] = keep[0] or not keep.any()
+    starts = starts[keep]
+    types = codes[starts]
+    # A dropped leading run is covered by the first kept sector, which now starts at point 0
+    starts[0] = 0
+
+    # Join neighbours that now have the same type
+    distinct = np.concatenate(([True], types[1:] != types[:-1]))
+    starts = starts[distinct]
+    types = types[distinct]
+    ends = np.append(starts[1:], n)
+
+    avg_speeds = np.add.reduceat(speeds, starts) / (ends - starts)
+    start_distances = distances[starts]
+    end_distances = np.append(distances[starts[1:]], distances[-1])
+
+    return [
+        {
+            "type": SECTOR_TYPES[code],
+            "start_idx": int(start),
+            "end_idx": int(end),
+            "start_distance": float(start_distance),
+            "end_distance": float(end_distance),
+            "length": float(end_distance - start_distance),
+            "avg_speed": float(avg_speed),
+        }
+        for code, start, end, start_distance, end_distance, avg_speed
+        in zip(types.tolist(), starts, ends, start_distances, end_distances, avg_speeds)
+    ]
+
+
+class SectorTable:
+    """Distance-indexed sector table; sector_at() is a binary search"""
+
+    def __init__(self, sectors: Optional[List[Dict]] = None):
+        self.sectors = list(sectors or [])
+        self.start_distances = [sector["start_distance"] for sector in self.sectors]
+
+    @classmethod
+    def from_points(cls, points: List[Dict]) -> "SectorTable":
+        """Segment a list of track points (empty table if they carry no speed)"""
+        if not points or "speed" not in points[0]:
+            return cls()
+        distances = np.fromiter((p["distance"] for p in points), dtype=np.float64, count=len(points))
+        speeds = np.fromiter((p["speed"] for p in points), dtype=np.float64, count=len(points))
+        return cls(segment_sectors(distances, speeds))
+
+    @classmethod
+    def from_track(cls, track_data: Dict) -> "SectorTable":
+        """Persisted sectors of a track file, or segment its points"""
+        sectors = track_data.get("sectors")
+        if sectors and "start_distance" in sectors[0]:
+            return cls(sectors)
+        return cls.from_points(track_data.get("points", []))
+
+    def __len__(self) -> int:
+        return len(self.sectors)
+
+    def index_at(self, distance: float) -> int:
+        """Index of the sector containing distance (-1 if the table is empty)"""
+        if not self.sectors:
+            return -1
+        return max(0, bisect_right(self.start_distances, distance) - 1)
+
+    def sector_at(self, distance: float) -> Optional[Dict]:
+        index = self.index_at(distance)
+        return self.sectors[index] if index >= 0 else None
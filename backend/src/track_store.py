@@ -0,0 +1,57 @@
+"""
+Compact track storage for Race Oracle
+Tracks are written as JSON for the frontend and, alongside, as an .npz of
+typed columns that loads without parsing one dict per point.
+"""
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Per-point columns, in the key order of a JSON track point
+TRACK_COLUMNS = ["x", "y", "z", "distance", "speed", "throttle", "brake"]
+
+
+def points_from_columns(columns: Dict[str, np.ndarray]) -> List[Dict]:
+    """Point dicts from column arrays (bulk conversion, no per-row indexing)"""
+    names = [name for name in TRACK_COLUMNS if name in columns]
+    values = [np.asarray(columns[name], dtype=np.float64).tolist() for name in names]
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def track_columns(track_data: Dict) -> Dict[str, np.ndarray]:
+    """Column arrays of a JSON-style track"""
+    points = track_data["points"]
+    return {
+        name: np.array([p.get(name, 0.0) for p in points], dtype=np.float64)
+        for name in TRACK_COLUMNS
+    }
+
+
+def compact_path(json_path) -> Path:
+    return Path(json_path).with_suffix(".npz")
+
+
+def save_track(track_data: Dict, json_path, columns: Optional[Dict[str, np.ndarray]] = None):
+    """Write the track JSON (compact separators) and its .npz twin"""
+    json_path = Path(json_path)
+    json_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(json_path, 'w') as f:
+        json.dump(track_data, f, separators=(",", ":"))
+
+    columns = columns if columns is not None else track_columns(track_data)
+    fields = {k: v for k, v in track_data.items() if k != "points"}
+    np.savez_compressed(
+        compact_path(json_path),
+        meta=np.array(json.dumps(fields)),
+        **{name: np.asarray(columns[name], dtype=np.float64) for name in TRACK_COLUMNS if name in columns},
+    )
+
+
+def load_track_columns(npz_path) -> Dict:
+    """Track fields plus a "columns" dict of arrays, from an .npz written by save_track"""
+    with np.load(npz_path) as data:
+        track_data = json.loads(str(data["meta"]))
+        track_data["columns"] = {name: data[name] for name in TRACK_COLUMNS if name in data.files}
+    return track_data
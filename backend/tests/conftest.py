@@ -0,0 +1,5 @@
+"""Make the flat modules in backend/src importable by bare name, as the server does"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,84 @@
+"""Telemetry store backfills against a minimal stand-in for a FastF1 session"""
+import numpy as np
+import pandas as pd
+
+from fetch_real_data import backfill_driver_telemetry, fetch_driver_telemetry
+from telemetry_store import TelemetryStore
+
+YEAR, CIRCUIT, DRIVER = 2024, "Monza", "VER"
+
+
+class FakeLap:
+    def __init__(self, number: int, num_points: int = 50, lap_time=80.0):
+        self.number = number
+        self.num_points = num_points
+        self.lap_time = lap_time
+        self.telemetry_requests = 0
+
+    def __getitem__(self, key):
+        return {"LapNumber": self.number, "LapTime": self.lap_time}[key]
+
+    def get_telemetry(self):
+        self.telemetry_requests += 1
+        angle = np.linspace(0.0, 2.0 * np.pi, self.num_points, endpoint=False)
+        speed = 200.0 + 50.0 * np.cos(angle) + self.number
+        return pd.DataFrame({
+            "Time": pd.to_timedelta(np.linspace(0.0, 80.0, self.num_points), unit="s"),
+            "Speed": speed,
+            "Throttle": np.clip(speed / 3.0, 0.0, 100.0),
+            "Brake": speed < 170.0,
+            "X": 1000.0 * np.cos(angle),
+            "Y": 600.0 * np.sin(angle),
+        })
+
+
+class FakeLaps:
+    def __init__(self, laps):
+        self.laps = laps
+
+    def pick_driver(self, driver_code):
+        return self
+
+    def iterrows(self):
+        return enumerate(self.laps)
+
+
+class FakeSession:
+    """Only what backfill_driver_telemetry reads: session.laps.pick_driver(code).iterrows()"""
+
+    def __init__(self, laps):
+        self.laps = FakeLaps(laps)
+
+
+def test_backfill_then_incremental_run(tmp_path):
+    store = TelemetryStore(tmp_path)
+    first = [FakeLap(1), FakeLap(2)]
+    assert backfill_driver_telemetry(YEAR, CIRCUIT, DRIVER, FakeSession(first), store) == [1, 2]
+    assert store.laps(YEAR, CIRCUIT, DRIVER) == [1, 2]
+
+    # The session has moved on: only the new lap is written, and only its telemetry is requested
+    later = [FakeLap(1), FakeLap(2), FakeLap(3, num_points=30)]
+    assert backfill_driver_telemetry(YEAR, CIRCUIT, DRIVER, FakeSession(later), store) == [3]
+    assert [lap.telemetry_requests for lap in later] == [0, 0, 1]
+
+    columns = store.load(YEAR, CIRCUIT, DRIVER)
+    assert len(columns["time"]) == 50 + 50 + 30
+    assert np.array_equal(np.unique(columns["lap"]), [1, 2, 3])
+    lap_3 = later[2].get_telemetry()
+    np.testing.assert_allclose(columns["speed"][columns["lap"] == 3], lap_3["Speed"], rtol=1e-6)
+    np.testing.assert_allclose(columns["time"][columns["lap"] == 3], lap_3["Time"].dt.total_seconds())
+
+
+def test_backfill_skips_laps_without_a_time(tmp_path):
+    store = TelemetryStore(tmp_path)
+    laps = [FakeLap(1), FakeLap(2, lap_time=None)]
+    assert backfill_driver_telemetry(YEAR, CIRCUIT, DRIVER, FakeSession(laps), store) == [1]
+    assert laps[1].telemetry_requests == 0
+
+
+def test_fetch_reads_back_from_the_store(tmp_path):
+    store = TelemetryStore(tmp_path)
+    points = fetch_driver_telemetry(YEAR, CIRCUIT, DRIVER, FakeSession([FakeLap(1, num_points=10)]), store)
+    assert len(points) == 10
+    assert set(points[0]) == {"lap", "time", "speed", "throttle", "brake", "x", "y"}
+    assert points[0]["lap"] == 1
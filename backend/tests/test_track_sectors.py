@@ -0,0 +1,38 @@
+"""Sector segmentation of speed profiles"""
+import numpy as np
+
+from track_sectors import SectorTable, segment_sectors
+
+SLOW, MEDIUM, FAST = 50.0, 100.0, 200.0
+
+
+def _profile(*runs):
+    """Speeds made of (speed, points) runs, one distance unit per point"""
+    speeds = np.concatenate([np.full(points, speed) for speed, points in runs])
+    return np.arange(len(speeds), dtype=np.float64), speeds
+
+
+def _types(sectors):
+    return [(sector["type"], sector["start_idx"], sector["end_idx"]) for sector in sectors]
+
+
+def test_short_run_joins_the_sector_before_it():
+    distances, speeds = _profile((FAST, 30), (SLOW, 5), (FAST, 30), (SLOW, 30))
+    sectors = segment_sectors(distances, speeds, min_points=10)
+    assert [sector["type"] for sector in sectors] == ["straight", "corner"]
+    assert sectors[0]["start_idx"] == 0 and sectors[0]["end_idx"] == 65
+
+
+def test_short_first_run_joins_the_sector_after_it():
+    distances, speeds = _profile((SLOW, 5), (FAST, 30), (MEDIUM, 30))
+    sectors = segment_sectors(distances, speeds, min_points=10)
+    assert _types(sectors) == [("straight", 0, 35), ("medium", 35, 65)]
+    assert sectors[0]["start_distance"] == 0.0
+    assert SectorTable(sectors).sector_at(2.0)["type"] == "straight"
+
+
+def test_only_short_runs_still_cover_the_track():
+    distances, speeds = _profile((SLOW, 5), (FAST, 5))
+    sectors = segment_sectors(distances, speeds, min_points=10)
+    assert len(sectors) == 1
+    assert (sectors[0]["start_idx"], sectors[0]["end_idx"]) == (0, 10)